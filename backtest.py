@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+import itertools
+import concurrent.futures
+import numpy as np
+import pandas as pd
+from history import HISTORY_DB, HistoryStore
+from league_data import ESPN_LINEUP_SLOTS
+from valuation import POSITIONS, RosterSlots, grade_roster
+
+# Backtest the team grade against what actually happened in stored seasons (see
+# history.py). Every team's roster is graded week by week with only what was known
+# before kickoff, and the grades are compared with that week's points and results.
+# Usage: python backtest.py LEAGUE_ID [LEAGUE_ID ...]
+
+# Processes grading seasons at once
+BACKTEST_WORKERS = int(os.environ.get('BACKTEST_WORKERS', os.cpu_count() or 1))
+
+# Parameter sweep: every combination is graded and scored
+BENCH_MULTIPLIERS = [float(x) for x in os.environ.get('BACKTEST_BENCH_MULTIPLIERS', '0,1,2,5,10').split(',')]
+BENCH_WEIGHTS = ['lineup', 'flat']
+VALUE_BASES = ['projected', 'trailing']
+
+
+def parameter_grid(bench_multipliers=BENCH_MULTIPLIERS, bench_weights=BENCH_WEIGHTS, value_bases=VALUE_BASES):
+    return [{'bench_multiplier': m, 'bench_weights': w, 'value': v} for m, w, v in itertools.product(bench_multipliers, bench_weights, value_bases)]
+
+
+# The league's roster slots, read off the lineups: the most of each slot any team used
+# in any week
+def season_slots(lineups):
+    used = lineups.groupby(['week', 'team_id', 'slot']).size().groupby('slot').max()
+    return RosterSlots(**{field: int(used.get(label, 0)) for field, label in ESPN_LINEUP_SLOTS.items()})
+
+
+# Player values as of each week. 'projected' is ESPN's projection for the week;
+# 'trailing' is the player's average over the earlier weeks they played this season,
+# falling back to the projection until they have one. Byes and weeks they didn't play
+# (no points and no projection) are left out of the average rather than counted as zeros.
+def _week_values(lineups):
+    lineups = lineups.sort_values(['player_id', 'week'], kind='stable').drop_duplicates(['player_id', 'week', 'team_id'])
+    played = lineups['points'].notna() & ~((lineups['points'] == 0) & (lineups['projected_points'].fillna(0) == 0))
+    points = lineups['points'].where(played, 0)
+    games = played.astype(int)
+    earlier_total = points.groupby(lineups['player_id']).cumsum() - points
+    earlier_games = games.groupby(lineups['player_id']).cumsum() - games
+    trailing = (earlier_total/earlier_games.replace(0, np.nan)).fillna(lineups['projected_points'])
+    return lineups.assign(projected=lineups['projected_points'], trailing=trailing, Pos=lineups['position'])
+
+
+# Grade every team-week of one stored season under every parameter combination. Runs
+# in a worker process, so it opens its own connection to the store.
+def backtest_season(path, league_id, season, grid):
+    store = HistoryStore(path)
+    lineups = store.query("SELECT week, team_id, player_id, position, slot, points, projected_points FROM lineups "
+                          "WHERE league_id = ? AND season = ?", (league_id, season))
+    if lineups.empty:
+        return pd.DataFrame()
+    slots = season_slots(lineups)
+    values = _week_values(lineups)
+    flat = dict.fromkeys(POSITIONS, 1/len(POSITIONS))
+
+    rows = []
+    for (week, team_id), roster in values.groupby(['week', 'team_id'], sort=False):
+        for n, params in enumerate(grid):
+            grade = grade_roster(roster, params['value'], slots, params['bench_multiplier'],
+                                 flat if params['bench_weights'] == 'flat' else None)
+            rows.append((league_id, season, week, team_id, n, grade.score))
+    return pd.DataFrame(rows, columns=['league_id', 'season', 'week', 'team_id', 'combo', 'grade'])
+
+
+# How well each combination's grades line up with actual results, best first:
+#   points r      - correlation of a team's grade with its points that week
+#   rank r        - the same on ranks within each week, so scoring levels don't matter
+#   win accuracy  - share of regular season games the higher-graded team won
+def score_grades(grades, matchups, grid):
+    games = matchups[matchups['is_playoff'] == 0]
+    team_weeks = grades.merge(games[['league_id', 'season', 'week', 'team_id', 'opponent_id', 'points', 'opponent_points']],
+                              on=['league_id', 'season', 'week', 'team_id'])
+    opponent_grades = grades.rename(columns={'team_id': 'opponent_id', 'grade': 'opponent_grade'})
+    team_weeks = team_weeks.merge(opponent_grades, on=['league_id', 'season', 'week', 'opponent_id', 'combo'], how='left')
+
+    week_groups = team_weeks.groupby(['league_id', 'season', 'week', 'combo'])
+    team_weeks['grade_rank'] = week_groups['grade'].rank()
+    team_weeks['points_rank'] = week_groups['points'].rank()
+
+    decided = team_weeks[(team_weeks['points'] != team_weeks['opponent_points']) & (team_weeks['grade'] != team_weeks['opponent_grade'])
+                         & team_weeks['opponent_grade'].notna()]
+    called = (decided['grade'] > decided['opponent_grade']) == (decided['points'] > decided['opponent_points'])
+
+    summary = pd.DataFrame(grid)
+    by_combo = team_weeks.groupby('combo')
+    summary['points r'] = by_combo.apply(lambda df: df['grade'].corr(df['points']))
+    summary['rank r'] = by_combo.apply(lambda df: df['grade_rank'].corr(df['points_rank']))
+    summary['win accuracy'] = called.groupby(decided['combo']).mean()
+    summary['team weeks'] = by_combo.size()
+    return summary.sort_values('win accuracy', ascending=False, ignore_index=True)
+
+
+# Backtest every stored season of the given leagues, one process per season
+def run_backtest(league_ids, grid=None, path=HISTORY_DB, workers=BACKTEST_WORKERS):
+    grid = grid or parameter_grid()
+    store = HistoryStore(path)
+    seasons = [(league_id, season) for league_id in league_ids for season in store.seasons(league_id)['season']]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        grades = list(pool.map(backtest_season, *zip(*[(path, league_id, season, grid) for league_id, season in seasons]))) if seasons else []
+    grades = pd.concat(grades, ignore_index=True) if grades else pd.DataFrame(columns=['league_id', 'season', 'week', 'team_id', 'combo', 'grade'])
+    matchups = pd.concat([store.table('matchups', league_id) for league_id in league_ids], ignore_index=True)
+    return score_grades(grades, matchups, grid)
+
+
+if __name__ == '__main__':
+    start = time.perf_counter()
+    results = run_backtest([int(x) for x in sys.argv[1:]])
+    print(results.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    print(f"{len(results)} combinations backtested in {time.perf_counter() - start:.1f}s")
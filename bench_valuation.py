@@ -0,0 +1,50 @@
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from valuation import POSITIONS, RosterSlots, match_roster, grade_roster, lineup_rows, split_lineup, greedy_is_optimal
+
+# Benchmark the valuation path: peak allocations and time per roster grade.
+# Usage: python bench_valuation.py [teams] [roster size]
+teams = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+roster_size = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+# Synthetic rankings with a realistic position mix
+rng = np.random.default_rng(0)
+pos = rng.choice(POSITIONS, 600, p=[.12, .25, .33, .14, .08, .08])
+ros = pd.DataFrame({'Player Name': [f'Player {i}' for i in range(len(pos))], 'Team': 'FA', 'Pos': pos, 'PPR': rng.random(len(pos))*25})
+rosters = [list(ros['Player Name'].sample(roster_size, random_state=t)) for t in range(teams)]
+slots = RosterSlots(1, 2, 2, 1, 1, 1, 1, 1, 6)
+
+# Exact lookups, so the benchmark measures valuation rather than fuzzy matching
+lookup = set(ros['Player Name'])
+def exact_match(name, choices):
+    return (name, 100) if name in lookup else None
+
+values = [match_roster(r, ros, exact_match, columns=['Player Name', 'Team', 'Pos', 'PPR']) for r in rosters]
+
+for label, bench_multiplier in [('redraft', 1), ('dynasty', 5)]:
+    peaks = []
+    start = time.perf_counter()
+    for team_values in values:
+        tracemalloc.start()
+        grade = grade_roster(team_values, 'PPR', slots, bench_multiplier)
+        team_values.take(lineup_rows(grade))
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {len(values)} grades, peak {np.mean(peaks)/1024:.1f} KiB mean / {max(peaks)/1024:.1f} KiB max per grade, "
+          f"{elapsed/len(values)*1000:.2f} ms per grade (traced)")
+
+# Lineup solver: the greedy fast path against the exact solve that multi-flex formats need
+pos_by_team = [team_values['Pos'].to_numpy(dtype=object) for team_values in values]
+points_by_team = [team_values['PPR'].to_numpy(dtype=np.float64) for team_values in values]
+for label, solver_slots in [('greedy', slots), ('exact', RosterSlots(1, 2, 2, 1, 1, 1, 1, 1, 6, rb_wr=1, wr_te=1))]:
+    assert greedy_is_optimal(solver_slots) == (label == 'greedy')
+    start = time.perf_counter()
+    for _ in range(20):
+        for team_pos, team_points in zip(pos_by_team, points_by_team):
+            split_lineup(team_pos, team_points, solver_slots)
+    elapsed = time.perf_counter() - start
+    print(f"{label} lineups: {elapsed/(20*len(values))*1000:.3f} ms per team")
@@ -0,0 +1,166 @@
+import os
+import time
+import pickle
+import sqlite3
+import threading
+
+####################
+##### Backends #####
+####################
+
+# Every backend stores bytes under string keys with an optional TTL in seconds:
+#   get(key) -> bytes or None, set(key, value, ttl=None), delete(key)
+
+
+# In-process dict. The default, and what a single replica has always had.
+class MemoryBackend:
+    is_shared = False
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and time.time() > expires_at:
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl if ttl else None)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+# Local-disk cache in one SQLite file, shared by every process on the host
+class SQLiteBackend:
+    is_shared = True
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)")
+
+    # One connection per thread; Streamlit runs each session on its own thread
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] is not None and time.time() > row[1]:
+            self.delete(key)
+            return None
+        return row[0]
+
+    def set(self, key, value, ttl=None):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                         (key, sqlite3.Binary(value), time.time() + ttl if ttl else None))
+
+    def delete(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+
+# Networked key-value store shared by every replica. Works with a redis-py client or
+# anything with the same get/set(ex=)/delete methods, such as LocalKVClient.
+class KeyValueBackend:
+    is_shared = True
+
+    def __init__(self, client, prefix='espncalc:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("CACHE_BACKEND=redis://... needs the redis package (pip install redis)")
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, value, ex=int(ttl) if ttl else None)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+
+# Local stand-in for a redis client, for tests and single-box runs
+class LocalKVClient:
+    def __init__(self):
+        self._store = MemoryBackend()
+
+    def get(self, key):
+        return self._store.get(key)
+
+    def set(self, key, value, ex=None):
+        self._store.set(key, value, ttl=ex)
+        return True
+
+    def delete(self, key):
+        self._store.delete(key)
+        return 1
+
+
+########################
+##### Shared Cache #####
+########################
+
+# Pickles values into whichever backend is configured and namespaces the keys.
+# Callers that already keep their own in-process copy check is_shared and skip the
+# backend when it is only another in-process dict.
+class SharedCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.is_shared = backend.is_shared
+
+    def get(self, namespace, key):
+        value = self.backend.get(f"{namespace}:{key}")
+        return None if value is None else pickle.loads(value)
+
+    def set(self, namespace, key, value, ttl=None):
+        self.backend.set(f"{namespace}:{key}", pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ttl)
+
+    def get_or_set(self, namespace, key, loader, ttl=None):
+        value = self.get(namespace, key)
+        if value is None:
+            value = loader()
+            self.set(namespace, key, value, ttl)
+        return value
+
+
+# Pick a backend from a spec: "memory", "sqlite:///abs/path/cache.db", "sqlite://relative.db",
+# "redis://host:6379/0" or "local-kv"
+def backend_from_spec(spec):
+    if spec == 'memory':
+        return MemoryBackend()
+    if spec.startswith('sqlite://'):
+        return SQLiteBackend(spec[len('sqlite://'):])
+    if spec.startswith(('redis://', 'rediss://')):
+        return KeyValueBackend.from_url(spec)
+    if spec == 'local-kv':
+        return KeyValueBackend(LocalKVClient())
+    raise ValueError(f"Unknown CACHE_BACKEND {spec!r}")
+
+
+shared_cache = SharedCache(backend_from_spec(os.environ.get('CACHE_BACKEND', 'memory')))
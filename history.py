@@ -0,0 +1,206 @@
+import os
+import sys
+import time
+import sqlite3
+import logging
+import threading
+import concurrent.futures
+import pandas as pd
+from espn_api.football import League
+from http_client import install_espn_client
+
+# Route every espn_api request through the shared pooled client
+install_espn_client()
+
+# Local store of past seasons, next to the app unless told otherwise
+HISTORY_DB = os.environ.get('LEAGUE_HISTORY_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.league_history.sqlite'))
+
+# Seasons and weeks fetched from ESPN at once
+HISTORY_FETCH_WORKERS = int(os.environ.get('LEAGUE_HISTORY_WORKERS', 8))
+
+# ESPN only serves box scores and transactions from 2019 on
+FIRST_BOX_SCORE_YEAR = 2019
+
+# Transaction types kept per week
+HISTORY_TRANSACTION_TYPES = {"FREEAGENT", "WAIVER", "TRADE_ACCEPT"}
+
+# What League.transactions() raises with for a week without any
+NO_TRANSACTIONS_MESSAGE = "No transactions found"
+
+##################
+##### Schema #####
+##################
+
+# Every table is keyed by (league_id, season) first, so each season is its own
+# partition that a re-ingest replaces as a whole
+HISTORY_TABLES = {
+    'seasons': ['league_id', 'season', 'name', 'team_count', 'reg_season_count', 'playoff_team_count', 'final_week', 'fetched_at'],
+    'teams': ['league_id', 'season', 'team_id', 'name', 'wins', 'losses', 'ties', 'points_for', 'points_against', 'standing', 'final_standing'],
+    'matchups': ['league_id', 'season', 'week', 'team_id', 'opponent_id', 'points', 'opponent_points', 'projected_points', 'is_playoff'],
+    'lineups': ['league_id', 'season', 'week', 'team_id', 'player_id', 'player_name', 'position', 'slot', 'pro_team', 'points', 'projected_points'],
+    'transactions': ['league_id', 'season', 'week', 'team_id', 'player_id', 'player_name', 'type', 'item_type', 'from_team_id', 'to_team_id', 'date'],
+}
+
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seasons (league_id INTEGER, season INTEGER, name TEXT, team_count INTEGER, reg_season_count INTEGER,
+                                    playoff_team_count INTEGER, final_week INTEGER, fetched_at REAL, PRIMARY KEY (league_id, season));
+CREATE TABLE IF NOT EXISTS teams (league_id INTEGER, season INTEGER, team_id INTEGER, name TEXT, wins INTEGER, losses INTEGER, ties INTEGER,
+                                  points_for REAL, points_against REAL, standing INTEGER, final_standing INTEGER,
+                                  PRIMARY KEY (league_id, season, team_id));
+CREATE TABLE IF NOT EXISTS matchups (league_id INTEGER, season INTEGER, week INTEGER, team_id INTEGER, opponent_id INTEGER, points REAL,
+                                     opponent_points REAL, projected_points REAL, is_playoff INTEGER,
+                                     PRIMARY KEY (league_id, season, week, team_id));
+CREATE TABLE IF NOT EXISTS lineups (league_id INTEGER, season INTEGER, week INTEGER, team_id INTEGER, player_id INTEGER, player_name TEXT,
+                                    position TEXT, slot TEXT, pro_team TEXT, points REAL, projected_points REAL);
+CREATE INDEX IF NOT EXISTS lineups_by_team ON lineups (league_id, season, week, team_id, player_id);
+CREATE INDEX IF NOT EXISTS lineups_by_player ON lineups (league_id, player_id, season, week);
+CREATE TABLE IF NOT EXISTS transactions (league_id INTEGER, season INTEGER, week INTEGER, team_id INTEGER, player_id INTEGER, player_name TEXT,
+                                         type TEXT, item_type TEXT, from_team_id INTEGER, to_team_id INTEGER, date INTEGER);
+CREATE INDEX IF NOT EXISTS transactions_by_team ON transactions (league_id, season, week, team_id, player_id);
+CREATE INDEX IF NOT EXISTS transactions_by_player ON transactions (league_id, player_id, season, week);
+"""
+
+
+# One SQLite file of past seasons. Reads come back as DataFrames; a season is written
+# in one transaction, replacing whatever was stored for it before.
+class HistoryStore:
+    def __init__(self, path=HISTORY_DB):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(HISTORY_SCHEMA)
+
+    # One connection per thread, like the SQLite cache backend
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def write_season(self, league_id, season, tables):
+        with self._connect() as conn:
+            for table, columns in HISTORY_TABLES.items():
+                conn.execute(f"DELETE FROM {table} WHERE league_id = ? AND season = ?", (league_id, season))
+                rows = tables.get(table, [])
+                if rows:
+                    conn.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?'*len(columns))})",
+                                     [tuple(row[c] for c in columns) for row in rows])
+
+    def query(self, sql, params=()):
+        return pd.read_sql_query(sql, self._connect(), params=params)
+
+    # Rows of one table for a league, optionally limited to some seasons
+    def table(self, table, league_id, seasons=None):
+        sql = f"SELECT * FROM {table} WHERE league_id = ?"
+        params = [league_id]
+        if seasons is not None:
+            seasons = list(seasons)
+            sql += f" AND season IN ({', '.join('?'*len(seasons))})"
+            params += seasons
+        return self.query(sql, params)
+
+    def seasons(self, league_id):
+        return self.table('seasons', league_id).sort_values('season', ignore_index=True)
+
+
+#####################
+##### Ingestion #####
+#####################
+
+def _season_rows(league):
+    settings = league.settings
+    season = {'league_id': league.league_id, 'season': league.year, 'name': getattr(settings, 'name', str(league.league_id)),
+              'team_count': settings.team_count, 'reg_season_count': settings.reg_season_count,
+              'playoff_team_count': settings.playoff_team_count, 'final_week': getattr(league, 'finalScoringPeriod', 0) or settings.reg_season_count,
+              'fetched_at': time.time()}
+    teams = [{'league_id': league.league_id, 'season': league.year, 'team_id': team.team_id, 'name': team.team_name,
+              'wins': team.wins, 'losses': team.losses, 'ties': team.ties, 'points_for': team.points_for,
+              'points_against': getattr(team, 'points_against', None), 'standing': getattr(team, 'standing', None),
+              'final_standing': getattr(team, 'final_standing', None)}
+             for team in league.teams]
+    return season, teams
+
+
+# Both sides of every game in a week, and every player in each lineup
+def _week_rows(league, week):
+    matchups, lineups = [], []
+    for box in league.box_scores(week):
+        sides = [(box.home_team, box.home_score, box.home_projected, box.home_lineup, box.away_team, box.away_score),
+                 (box.away_team, box.away_score, box.away_projected, box.away_lineup, box.home_team, box.home_score)]
+        for team, points, projected, lineup, opponent, opponent_points in sides:
+            # A bye in the playoffs leaves one side empty
+            if not hasattr(team, 'team_id'):
+                continue
+            matchups.append({'league_id': league.league_id, 'season': league.year, 'week': week, 'team_id': team.team_id,
+                             'opponent_id': getattr(opponent, 'team_id', None), 'points': points,
+                             'opponent_points': opponent_points if hasattr(opponent, 'team_id') else None,
+                             'projected_points': projected, 'is_playoff': int(getattr(box, 'is_playoff', False))})
+            lineups += [{'league_id': league.league_id, 'season': league.year, 'week': week, 'team_id': team.team_id,
+                         'player_id': player.playerId, 'player_name': player.name, 'position': player.position,
+                         'slot': player.slot_position, 'pro_team': getattr(player, 'proTeam', None),
+                         'points': player.points, 'projected_points': player.projected_points}
+                        for player in lineup]
+    return matchups, lineups
+
+
+def _week_transactions(league, week):
+    try:
+        transactions = league.transactions(scoring_period=week, types=HISTORY_TRANSACTION_TYPES)
+    except Exception as e:
+        # espn_api raises a bare Exception when a week has no transactions at all
+        if str(e) != NO_TRANSACTIONS_MESSAGE:
+            logging.getLogger(__name__).warning("Couldn't load transactions for league %s, %s week %s",
+                                                league.league_id, league.year, week, exc_info=True)
+        return []
+    return [{'league_id': league.league_id, 'season': league.year, 'week': week, 'team_id': transaction.team_id,
+             'player_id': item.playerId, 'player_name': str(item.player), 'type': transaction.type, 'item_type': item.type,
+             'from_team_id': item.from_team_id, 'to_team_id': item.to_team_id, 'date': transaction.date}
+            for transaction in transactions for item in transaction.items]
+
+
+# Pull whole seasons of a league into the store. Seasons load in parallel, then every
+# week of every season is fetched on the same pool; each season is written once all of
+# its weeks are in. Returns the seasons stored.
+def ingest_league_history(league_id, years, swid, espn_s2, store=None, workers=HISTORY_FETCH_WORKERS):
+    store = store or HistoryStore()
+    log = logging.getLogger(__name__)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        leagues = {}
+        for year, future in [(year, pool.submit(League, league_id, year, swid=swid, espn_s2=espn_s2)) for year in years]:
+            try:
+                leagues[year] = future.result()
+            except Exception:
+                log.warning("Couldn't load league %s for %s", league_id, year, exc_info=True)
+
+        weeks = {}
+        for year, league in leagues.items():
+            if year < FIRST_BOX_SCORE_YEAR:
+                continue
+            last_week = min(getattr(league, 'finalScoringPeriod', 0) or league.settings.reg_season_count, league.current_week)
+            for week in range(1, last_week + 1):
+                weeks[(year, week)] = (pool.submit(_week_rows, league, week), pool.submit(_week_transactions, league, week))
+
+        for year, league in leagues.items():
+            season, teams = _season_rows(league)
+            tables = {'seasons': [season], 'teams': teams, 'matchups': [], 'lineups': [], 'transactions': []}
+            for (week_year, week), (box_future, transaction_future) in weeks.items():
+                if week_year != year:
+                    continue
+                matchups, lineups = box_future.result()
+                tables['matchups'] += matchups
+                tables['lineups'] += lineups
+                tables['transactions'] += transaction_future.result()
+            store.write_season(league_id, year, tables)
+    return sorted(leagues)
+
+
+# Ingestion job: python history.py LEAGUE_ID FIRST_YEAR [LAST_YEAR], with the ESPN
+# cookies in ESPN_SWID and ESPN_S2
+if __name__ == '__main__':
+    league_id = int(sys.argv[1])
+    first_year = int(sys.argv[2])
+    last_year = int(sys.argv[3]) if len(sys.argv) > 3 else first_year
+    stored = ingest_league_history(league_id, range(first_year, last_year + 1), os.environ.get('ESPN_SWID'), os.environ.get('ESPN_S2'))
+    print(f"Stored {len(stored)} season{'s' if len(stored) != 1 else ''} of league {league_id} in {HISTORY_DB}: {', '.join(map(str, stored))}")
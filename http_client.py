@@ -0,0 +1,207 @@
+import os
+import re
+import time
+import random
+import logging
+import threading
+import collections
+import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+
+# Statuses worth retrying: rate limits and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Methods that are safe to send twice, and so the only ones retried by default
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    pass
+
+
+# Per-endpoint call counts, errors and latency
+EndpointStats = collections.namedtuple('EndpointStats', ['requests', 'errors', 'retries', 'total_seconds', 'max_seconds'])
+
+
+# Collapse ids in a URL path so every league/player shares one metrics key
+def endpoint_name(url):
+    parts = urlsplit(url)
+    return parts.netloc + re.sub(r'/\d+', '/:id', parts.path)
+
+
+###########################
+##### Circuit Breaker #####
+###########################
+
+# Opens after `threshold` consecutive failures to a host and fails fast for `cooldown`
+# seconds. After that a single trial request is let through while every other caller
+# keeps failing fast; its success closes the breaker and its failure re-opens it. A
+# trial that never reports back is given up on after another cooldown.
+class CircuitBreaker:
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.probe_started is not None:
+                if now - self.probe_started < self.cooldown:
+                    return False
+            elif self.opened_at is None:
+                return True
+            elif now - self.opened_at < self.cooldown:
+                return False
+            # Half open: this caller is the trial request
+            self.probe_started = now
+            return True
+
+    def record(self, ok):
+        with self._lock:
+            probing = self.probe_started is not None
+            self.probe_started = None
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                if probing or self.failures >= self.threshold:
+                    self.opened_at = time.monotonic()
+
+
+#######################
+##### HTTP Client #####
+#######################
+
+# One pooled keep-alive session for every outbound request (ESPN and rankings), with
+# bounded retries of idempotent requests and jittered backoff, a per-host concurrency limit and a circuit
+# breaker per host
+class HttpClient:
+    # So code written against the requests module can keep catching requests.exceptions
+    exceptions = requests.exceptions
+
+    def __init__(self, max_retries=3, backoff=0.5, max_backoff=8, per_host_limit=8, timeout=30,
+                 breaker_threshold=5, breaker_cooldown=30, metrics_file=None):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.metrics_file = metrics_file
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=per_host_limit*2)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._lock = threading.Lock()
+        self._host_limits = {}
+        self._breakers = {}
+        self._stats = {}
+        self._metrics_written = 0
+
+    def _host_state(self, host):
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+                self._breakers[host] = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown)
+            return self._host_limits[host], self._breakers[host]
+
+    def _record(self, endpoint, seconds, error, retries):
+        with self._lock:
+            stats = self._stats.get(endpoint, EndpointStats(0, 0, 0, 0.0, 0.0))
+            self._stats[endpoint] = EndpointStats(stats.requests + 1, stats.errors + int(error), stats.retries + retries,
+                                                  stats.total_seconds + seconds, max(stats.max_seconds, seconds))
+        self._maybe_write_metrics()
+
+    # Full jitter: sleep a random amount up to the capped exponential backoff
+    def _sleep_before_retry(self, attempt, response):
+        delay = random.uniform(0, min(self.max_backoff, self.backoff*2**attempt))
+        if response is not None and response.headers.get('Retry-After', '').isdigit():
+            delay = max(delay, min(self.max_backoff, int(response.headers['Retry-After'])))
+        time.sleep(delay)
+
+    # idempotent marks whether the request may be retried; by default only
+    # IDEMPOTENT_METHODS are, so a write is never sent twice
+    def request(self, method, url, idempotent=None, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        max_retries = self.max_retries if (method.upper() in IDEMPOTENT_METHODS if idempotent is None else idempotent) else 0
+        host = urlsplit(url).netloc
+        endpoint = endpoint_name(url)
+        limit, breaker = self._host_state(host)
+
+        start = time.perf_counter()
+        response = None
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                self._record(endpoint, time.perf_counter() - start, True, attempt)
+                raise CircuitOpenError(f"Too many recent failures talking to {host}, try again shortly")
+            try:
+                with limit:
+                    response = self.session.request(method, url, **kwargs)
+                failed = response.status_code in RETRY_STATUSES
+                error = None
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                response = None
+                failed = True
+                error = e
+            breaker.record(not failed)
+
+            if not failed or attempt >= max_retries:
+                self._record(endpoint, time.perf_counter() - start, failed, attempt)
+                if error is not None:
+                    raise error
+                return response
+            self._sleep_before_retry(attempt, response)
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, idempotent=False, **kwargs):
+        return self.request('POST', url, idempotent=idempotent, **kwargs)
+
+    def metrics(self):
+        with self._lock:
+            return dict(self._stats)
+
+    # Prometheus text exposition format, one series per endpoint
+    def prometheus_metrics(self):
+        lines = []
+        for name, field in [('espncalc_http_requests_total', 'requests'), ('espncalc_http_errors_total', 'errors'),
+                            ('espncalc_http_retries_total', 'retries'), ('espncalc_http_latency_seconds_sum', 'total_seconds'),
+                            ('espncalc_http_latency_seconds_max', 'max_seconds')]:
+            for endpoint, stats in sorted(self.metrics().items()):
+                lines.append(f'{name}{{endpoint="{endpoint}"}} {getattr(stats, field)}')
+        return '\n'.join(lines) + '\n'
+
+    # Write metrics for a node_exporter style textfile collector, at most every 10 seconds
+    def _maybe_write_metrics(self):
+        if not self.metrics_file or time.monotonic() - self._metrics_written < 10:
+            return
+        self._metrics_written = time.monotonic()
+        try:
+            tmp = self.metrics_file + '.tmp'
+            with open(tmp, 'w') as f:
+                f.write(self.prometheus_metrics())
+            os.replace(tmp, self.metrics_file)
+        except OSError:
+            logging.getLogger(__name__).warning("Could not write HTTP metrics to %s", self.metrics_file, exc_info=True)
+
+
+http_client = HttpClient(max_retries=int(os.environ.get('HTTP_MAX_RETRIES', 3)),
+                         per_host_limit=int(os.environ.get('HTTP_PER_HOST_LIMIT', 8)),
+                         metrics_file=os.environ.get('HTTP_METRICS_FILE'))
+
+
+# espn_api calls requests.get() directly from its request module. Point that module at
+# the shared client so League(...), free_agents() and activity fetches all go through it.
+def install_espn_client():
+    from espn_api.requests import espn_requests
+    espn_requests.requests = http_client
@@ -0,0 +1,688 @@
+import os
+import re
+import queue
+import asyncio
+import json
+import time
+import logging
+import pickle
+import hashlib
+import threading
+import collections
+import concurrent.futures
+from espn_api.football import League
+from espn_api.football.player import Player
+from espn_api.football.constant import POSITION_MAP, SETTINGS_SCORING_FORMAT_MAP
+from espn_api.requests.espn_requests import EspnFantasyRequests
+from cache_backends import shared_cache
+from http_client import install_espn_client
+
+# Route every espn_api request through the shared pooled client
+install_espn_client()
+
+FA_POSITIONS = ["QB", "RB", "WR", "TE", "K", "D/ST"]
+
+# Free agents are paged in chunks of this size until ESPN runs out, up to the cap per position
+FA_PAGE_SIZE = int(os.environ.get('LEAGUE_FA_PAGE_SIZE', 100))
+FA_MAX_PER_POSITION = int(os.environ.get('LEAGUE_FA_MAX_PER_POSITION', 1000))
+
+# Positions whose free agents page in at the same time during a full fetch
+FA_FETCH_WORKERS = int(os.environ.get('LEAGUE_FA_FETCH_WORKERS', len(FA_POSITIONS)))
+
+# Other spellings of ESPN's team abbreviations that show up in rankings
+PRO_TEAM_ALIASES = {'WAS': 'WSH', 'JAC': 'JAX', 'LA': 'LAR', 'STL': 'LAR', 'OAK': 'LV', 'LVR': 'LV', 'SD': 'LAC',
+                    'GBP': 'GB', 'KCC': 'KC', 'NEP': 'NE', 'NOR': 'NO', 'NOS': 'NO', 'SFO': 'SF', 'TBB': 'TB'}
+
+###########################
+##### League Snapshot #####
+###########################
+
+# Read-only dict that still pickles, so snapshots can be sized and shared
+class FrozenDict(dict):
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('league snapshots are read-only')
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+# Slim, immutable copies of what the app needs from espn_api objects
+PlayerSnapshot = collections.namedtuple('PlayerSnapshot', ['player_id', 'name', 'position', 'pro_team'])
+TeamSnapshot = collections.namedtuple('TeamSnapshot', ['team_id', 'name', 'player_ids', 'owner_ids', 'wins', 'losses', 'ties', 'points_for',
+                                                       'schedule', 'outcomes'])
+LeagueSnapshot = collections.namedtuple('LeagueSnapshot', ['league_id', 'year', 'name', 'fetched_at', 'current_week', 'team_count', 'reg_season_count',
+                                                           'playoff_team_count', 'teams', 'standings', 'players', 'free_agents', 'bye_weeks',
+                                                           'lineup_slots', 'scoring_points', 'full_fetched_at'],
+                                        # Snapshots cached before settings were kept read as having none, and
+                                        # ones that don't know when they were last fetched in full as too old
+                                        defaults=(FrozenDict(), FrozenDict(), 0.0))
+
+# What's left of the regular season: records so far and the unplayed games as
+# (week, team_id, opponent_id), each game listed once
+SeasonState = collections.namedtuple('SeasonState', ['team_ids', 'team_names', 'wins', 'points_for', 'games_played', 'games', 'playoff_team_count'])
+
+
+# Owner ids are member SWIDs, normalised to upper case without braces
+def _normalise_swid(swid):
+    return str(swid).strip().strip('{}').upper()
+
+
+def _owner_ids(team):
+    owners = getattr(team, 'owners', None) or []
+    return tuple(_normalise_swid(owner['id'] if isinstance(owner, dict) else owner) for owner in owners)
+
+
+def _player_snapshot(player):
+    return PlayerSnapshot(player.playerId, player.name, player.position, getattr(player, 'proTeam', None))
+
+
+# Each NFL team's bye weeks, from the pro schedules espn_api attaches to rostered players
+def _bye_weeks(league):
+    final_week = getattr(league, 'finalScoringPeriod', 0) or 18
+    byes = {}
+    for team in league.teams:
+        for player in team.roster:
+            schedule = getattr(player, 'schedule', None)
+            if schedule and player.proTeam not in byes:
+                played = {int(week) for week in schedule}
+                byes[player.proTeam] = tuple(week for week in range(1, final_week + 1) if week not in played)
+    return FrozenDict(byes)
+
+
+# Points per stat from the league's scoring settings, keyed by ESPN's stat abbreviation.
+# Read from the raw settings: espn_api builds scoring_format out of module-level dicts
+# that every League shares, so a league loaded alongside another can end up with its points.
+def _scoring_points(settings):
+    raw = getattr(settings, '_raw_scoring_settings', None)
+    if raw is None:
+        return {item['abbr']: item['points'] for item in getattr(settings, 'scoring_format', []) if item.get('abbr') != 'Unknown'}
+    points = {}
+    for item in raw.get('scoringItems', []):
+        abbr = SETTINGS_SCORING_FORMAT_MAP.get(item['statId'], {}).get('abbr')
+        if abbr is not None:
+            points[abbr] = item.get('pointsOverrides', {}).get('16') or item.get('points', 0)
+    return points
+
+
+# Copy the parts of a League we use into a snapshot, dropping the raw espn_api objects
+def snapshot_league(league, free_agents):
+    players = {}
+    teams = []
+    for team in league.teams:
+        for player in team.roster:
+            players[player.playerId] = _player_snapshot(player)
+        teams.append(TeamSnapshot(team.team_id, team.team_name, tuple(player.playerId for player in team.roster), _owner_ids(team),
+                                  team.wins, team.losses, team.ties, team.points_for,
+                                  # Opponents are Team objects once espn_api has linked them, ids before that
+                                  tuple(getattr(opponent, 'team_id', opponent) for opponent in team.schedule), tuple(team.outcomes)))
+
+    fa_ids = {}
+    for pos, fa in free_agents.items():
+        for player in fa:
+            players.setdefault(player.playerId, _player_snapshot(player))
+        fa_ids[pos] = tuple(player.playerId for player in fa)
+
+    settings = league.settings
+    # Older espn_api releases don't read the lineup or scoring settings at all
+    for setting in ('position_slot_counts', 'scoring_format'):
+        if not getattr(settings, setting, None):
+            logging.getLogger(__name__).warning("League %s/%s has no %s; roster slots and scoring won't be detected",
+                                                league.league_id, league.year, setting)
+    fetched_at = time.time()
+    return LeagueSnapshot(league_id=league.league_id,
+                          year=league.year,
+                          name=getattr(settings, 'name', str(league.league_id)),
+                          fetched_at=fetched_at,
+                          current_week=league.current_week,
+                          team_count=settings.team_count,
+                          reg_season_count=settings.reg_season_count,
+                          playoff_team_count=settings.playoff_team_count,
+                          teams=tuple(teams),
+                          standings=tuple(team.team_id for team in league.standings()),
+                          players=FrozenDict(players),
+                          free_agents=FrozenDict(fa_ids),
+                          bye_weeks=_bye_weeks(league),
+                          lineup_slots=FrozenDict(getattr(settings, 'position_slot_counts', {})),
+                          scoring_points=FrozenDict(_scoring_points(settings)),
+                          full_fetched_at=fetched_at)
+
+
+# Every free agent and waiver player at a position, most owned first. league.free_agents()
+# only returns one page, which left most of a deep league's pool out. on_page(names) is
+# called as each page arrives so matching can start before the whole pool is in.
+def fetch_free_agents(league, position, on_page=None, page_size=FA_PAGE_SIZE, max_players=FA_MAX_PER_POSITION):
+    players = {}
+    offset = 0
+    while offset < max_players:
+        filters = {"players": {"filterStatus": {"value": ["FREEAGENT", "WAIVERS"]},
+                               "filterSlotIds": {"value": [POSITION_MAP[position]]},
+                               "limit": page_size,
+                               "offset": offset,
+                               "sortPercOwned": {"sortPriority": 1, "sortAsc": False},
+                               "sortDraftRanks": {"sortPriority": 100, "sortAsc": True, "value": "STANDARD"}}}
+        data = league.espn_request.league_get(params={"view": "kona_player_info", "scoringPeriodId": league.current_week},
+                                              headers={"x-fantasy-filter": json.dumps(filters)})
+        page = [Player(wrap, league.year) for wrap in data.get("players", [])]
+        # Ownership can shift between pages, so a player may show up twice
+        page = [player for player in page if player.playerId not in players]
+        players.update((player.playerId, player) for player in page)
+        if on_page is not None and page:
+            on_page([player.name for player in page])
+        if len(data.get("players", [])) < page_size:
+            break
+        offset += page_size
+    return list(players.values())
+
+
+# Fetch a league and its full free agent pool from ESPN and snapshot it. Each position
+# pages through its free agents on its own worker thread, so on_free_agents may be
+# called from several threads at once.
+def fetch_league_snapshot(league_id, year, swid, espn_s2, on_free_agents=None, workers=FA_FETCH_WORKERS):
+    league = League(league_id, year, swid=swid, espn_s2=espn_s2)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(workers, len(FA_POSITIONS)))) as pool:
+        fetched = pool.map(lambda pos: fetch_free_agents(league, pos, on_page=on_free_agents), FA_POSITIONS)
+        free_agents = dict(zip(FA_POSITIONS, fetched))
+    return snapshot_league(league, free_agents)
+
+
+# Changes whenever the snapshot is refetched or refreshed, for keying derived results
+def snapshot_version(snapshot):
+    return f"{snapshot.league_id}:{snapshot.year}:{snapshot.fetched_at}"
+
+
+# Each team's player names, keyed by team name
+def roster_names(snapshot):
+    return {team.name: [snapshot.players[pid].name for pid in team.player_ids] for team in snapshot.teams}
+
+
+# The team owned by the user with this SWID, or None
+def user_team(snapshot, swid):
+    swid = _normalise_swid(swid)
+    for team in snapshot.teams:
+        if swid in team.owner_ids:
+            return team
+    return None
+
+
+# Records and remaining regular season games, for the season simulator. A game counts
+# as played once ESPN has decided it; bye weeks (a team scheduled against itself) are skipped.
+def season_state(snapshot):
+    games = {}
+    for team in snapshot.teams:
+        for week, (opponent, outcome) in enumerate(zip(team.schedule[:snapshot.reg_season_count], team.outcomes), start=1):
+            if outcome == 'U' and opponent != team.team_id:
+                games[(week, *sorted((team.team_id, opponent)))] = None
+    return SeasonState(team_ids=tuple(team.team_id for team in snapshot.teams),
+                       team_names=tuple(team.name for team in snapshot.teams),
+                       wins=tuple(team.wins + team.ties/2 for team in snapshot.teams),
+                       points_for=tuple(team.points_for for team in snapshot.teams),
+                       games_played=tuple(team.wins + team.losses + team.ties for team in snapshot.teams),
+                       games=tuple(games),
+                       playoff_team_count=snapshot.playoff_team_count)
+
+
+# Team names in projected draft order: the reverse of the current standings
+def projected_draft_order(snapshot):
+    names = {team.team_id: team.name for team in snapshot.teams}
+    return [names[team_id] for team_id in reversed(snapshot.standings)]
+
+
+# Regular season weeks still to be played, this week included
+def remaining_weeks(snapshot):
+    return list(range(snapshot.current_week, snapshot.reg_season_count + 1))
+
+
+# Bye weeks for each ranked player, looked up by their NFL team. Players on teams the
+# snapshot has no schedule for are treated as never on bye.
+def player_bye_weeks(snapshot, player_names, pro_teams):
+    byes = {}
+    for name, pro_team in zip(player_names, pro_teams):
+        pro_team = str(pro_team).upper()
+        byes[name] = snapshot.bye_weeks.get(PRO_TEAM_ALIASES.get(pro_team, pro_team), ())
+    return byes
+
+
+# ESPN's lineup slot label for each roster slot count the app grades with. 'RB/WR/TE' is
+# ESPN's FLEX and 'OP' (offensive player) its SuperFlex; IDP, IR and coach slots aren't graded.
+ESPN_LINEUP_SLOTS = {'qb': 'QB', 'rb': 'RB', 'wr': 'WR', 'te': 'TE', 'flex': 'RB/WR/TE', 'sflex': 'OP', 'k': 'K', 'dst': 'D/ST',
+                     'bench': 'BE', 'rb_wr': 'RB/WR', 'wr_te': 'WR/TE'}
+
+
+# Roster slot counts from the league's settings, keyed like RosterSlots' fields
+def league_roster_slots(snapshot):
+    return {field: int(snapshot.lineup_slots.get(label, 0)) for field, label in ESPN_LINEUP_SLOTS.items()}
+
+
+# The rankings scoring column that best fits the league's scoring settings, or None when
+# the snapshot has none. Tight end premiums are set per lineup slot, which espn_api
+# doesn't expose, so those columns are only ever picked by hand.
+def league_scoring(snapshot, mode):
+    if not snapshot.scoring_points:
+        return None
+    if mode == 'dynasty':
+        slots = league_roster_slots(snapshot)
+        return 'SuperFlex' if slots['sflex'] or slots['qb'] > 1 else '1 QB'
+    if snapshot.scoring_points.get('PTD', 4) >= 6:
+        return '6 Pt Pass'
+    reception = snapshot.scoring_points.get('REC', 0)
+    return 'PPR' if reception >= 1 else 'Half' if reception >= .5 else 'Std'
+
+
+# Free agent names for the given positions, in position order
+def free_agent_names(snapshot, positions=FA_POSITIONS):
+    return [snapshot.players[pid].name for pos in positions for pid in snapshot.free_agents.get(pos, ())]
+
+
+########################
+##### League Cache #####
+########################
+
+# Process-wide LRU cache of league snapshots, shared by every session. Entries are
+# sized by their pickled length and the least recently used ones are evicted once
+# the total goes over max_bytes.
+class LeagueCache:
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    # Credentials are part of the key, so a league is only served to callers who can read it
+    @staticmethod
+    def key(league_id, year, swid, espn_s2):
+        digest = hashlib.sha256(f"{swid}\0{espn_s2}".encode()).hexdigest()
+        return (int(league_id), int(year), digest)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[0].fetched_at > self.ttl:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    # The cached snapshot even if it has expired, as a base for a delta refresh
+    def peek(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[0]
+
+    def put(self, key, snapshot):
+        size = len(pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (snapshot, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    # Return the cached snapshot or build it with loader(). Only one caller per key
+    # runs the loader; the others wait and reuse its result. Key locks are counted by
+    # the callers using them and dropped once the last one is done, even if the load fails.
+    def get_or_fetch(self, key, loader):
+        snapshot = self.get(key)
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            key_lock, users = self._key_locks.get(key, (threading.Lock(), 0))
+            self._key_locks[key] = (key_lock, users + 1)
+        try:
+            with key_lock:
+                with self._lock:
+                    entry = self._entries.get(key)
+                if entry is not None and time.time() - entry[0].fetched_at <= self.ttl:
+                    return entry[0]
+                snapshot = loader()
+                self.put(key, snapshot)
+                return snapshot
+        finally:
+            with self._lock:
+                key_lock, users = self._key_locks[key]
+                if users == 1:
+                    del self._key_locks[key]
+                else:
+                    self._key_locks[key] = (key_lock, users - 1)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+league_cache = LeagueCache(max_bytes=int(os.environ.get('LEAGUE_CACHE_MAX_BYTES', 64*1024*1024)),
+                           ttl=int(os.environ.get('LEAGUE_CACHE_TTL', 3600)))
+
+
+# Snapshot for a league: this process's LRU first, then the shared cache backend, then
+# ESPN. An expired snapshot is brought up to date from recent activity when possible.
+# on_free_agents(names) is passed on to fetch_league_snapshot() for a full fetch.
+def load_league_snapshot(league_id, year, swid, espn_s2, on_free_agents=None):
+    key = league_cache.key(league_id, year, swid, espn_s2)
+
+    def refetch(stale):
+        # Deltas only patch rosters, so the age that counts is since the last full fetch
+        if stale is not None and time.time() - stale.full_fetched_at <= DELTA_MAX_AGE:
+            snapshot = refresh_league_snapshot(stale, swid, espn_s2)
+            if snapshot is not None:
+                return snapshot
+        return fetch_league_snapshot(league_id, year, swid, espn_s2, on_free_agents)
+
+    def loader():
+        if not shared_cache.is_shared:
+            return refetch(league_cache.peek(key))
+        shared_key = ':'.join(map(str, key))
+        snapshot = shared_cache.get('league', shared_key)
+        if snapshot is None or time.time() - snapshot.fetched_at > league_cache.ttl:
+            snapshot = refetch(snapshot or league_cache.peek(key))
+            # Keep stale copies around in the backend as delta refresh bases
+            shared_cache.set('league', shared_key, snapshot, ttl=DELTA_MAX_AGE)
+        return snapshot
+
+    return league_cache.get_or_fetch(key, loader)
+
+
+#########################
+##### Delta Refresh #####
+#########################
+
+# Past this age a snapshot is always refetched in full, so standings catch up too
+DELTA_MAX_AGE = int(os.environ.get('LEAGUE_DELTA_MAX_AGE', 6*3600))
+
+# Give up on the delta after this many pages of activity
+DELTA_MAX_PAGES = 4
+DELTA_PAGE_SIZE = 50
+
+# ESPN transaction message types (same ids as espn_api's ACTIVITY_MAP)
+ADD_MESSAGES = (178, 180)
+DROP_MESSAGES = (179, 181, 239)
+TRADE_MESSAGE = 244
+
+
+# Raw transaction topics newer than since (epoch seconds), newest first. Returns None
+# when there are more than we are willing to page through.
+def fetch_activity_since(league_id, year, swid, espn_s2, since):
+    espn_request = EspnFantasyRequests(sport='nfl', year=year, league_id=league_id, cookies={'espn_s2': espn_s2, 'SWID': swid})
+    since_ms = since*1000
+    topics = []
+    for page in range(DELTA_MAX_PAGES):
+        filters = {"topics": {"filterType": {"value": ["ACTIVITY_TRANSACTIONS"]},
+                              "limit": DELTA_PAGE_SIZE,
+                              "limitPerMessageSet": {"value": 25},
+                              "offset": page*DELTA_PAGE_SIZE,
+                              "sortMessageDate": {"sortPriority": 1, "sortAsc": False},
+                              "sortFor": {"sortPriority": 2, "sortAsc": False},
+                              "filterIncludeMessageTypeIds": {"value": [*ADD_MESSAGES, *DROP_MESSAGES, TRADE_MESSAGE]}}}
+        data = espn_request.league_get(extend="/communication/", params={"view": "kona_league_communication"},
+                                       headers={"x-fantasy-filter": json.dumps(filters)})
+        page_topics = data.get("topics", [])
+        for topic in page_topics:
+            if topic["date"] <= since_ms:
+                return topics
+            topics.append(topic)
+        if len(page_topics) < DELTA_PAGE_SIZE:
+            return topics
+    return None
+
+
+# Apply roster moves to a snapshot. Returns the new snapshot, or None if a move
+# can't be applied (e.g. an added player the snapshot has never seen).
+def apply_activity(snapshot, topics, fetched_at):
+    rosters = {team.team_id: list(team.player_ids) for team in snapshot.teams}
+    free_agents = {pos: list(ids) for pos, ids in snapshot.free_agents.items()}
+
+    # Oldest first, so the moves replay in order
+    for topic in reversed(topics):
+        for msg in topic.get("messages", []):
+            msg_id = msg.get("messageTypeId")
+            player_id = msg.get("targetId")
+            player = snapshot.players.get(player_id)
+            if player is None:
+                return None
+
+            if msg_id in ADD_MESSAGES:
+                team_id = msg.get("to")
+                if team_id not in rosters:
+                    return None
+                if player_id not in rosters[team_id]:
+                    rosters[team_id].append(player_id)
+                for ids in free_agents.values():
+                    if player_id in ids:
+                        ids.remove(player_id)
+            elif msg_id in DROP_MESSAGES:
+                team_id = msg.get("for") if msg_id == 239 else msg.get("to")
+                if team_id not in rosters:
+                    return None
+                if player_id in rosters[team_id]:
+                    rosters[team_id].remove(player_id)
+                fa = free_agents.setdefault(player.position, [])
+                if player_id not in fa:
+                    fa.append(player_id)
+            elif msg_id == TRADE_MESSAGE:
+                from_id, to_id = msg.get("from"), msg.get("to")
+                if from_id not in rosters or to_id not in rosters:
+                    return None
+                if player_id in rosters[from_id]:
+                    rosters[from_id].remove(player_id)
+                if player_id not in rosters[to_id]:
+                    rosters[to_id].append(player_id)
+            else:
+                return None
+
+    teams = tuple(team._replace(player_ids=tuple(rosters[team.team_id])) for team in snapshot.teams)
+    return snapshot._replace(fetched_at=fetched_at, teams=teams,
+                             free_agents=FrozenDict({pos: tuple(ids) for pos, ids in free_agents.items()}))
+
+
+# Bring a stale snapshot up to date from the league's recent activity instead of
+# refetching the whole league. Returns None when a full refetch is needed.
+def refresh_league_snapshot(snapshot, swid, espn_s2):
+    fetched_at = time.time()
+    try:
+        topics = fetch_activity_since(snapshot.league_id, snapshot.year, swid, espn_s2, snapshot.fetched_at)
+    except Exception:
+        logging.getLogger(__name__).warning("Recent activity fetch failed for %s/%s", snapshot.league_id, snapshot.year, exc_info=True)
+        return None
+    if topics is None:
+        return None
+    return apply_activity(snapshot, topics, fetched_at)
+
+
+####################
+##### Prefetch #####
+####################
+
+_prefetch_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix='league-prefetch')
+_prefetches = {}
+_prefetch_lock = threading.Lock()
+
+
+# Cheap sanity check before spending an ESPN request on half-typed credentials
+def credentials_look_valid(league_id, year, swid, espn_s2):
+    return (int(league_id) > 0 and 2000 <= int(year) <= 2100
+            and re.fullmatch(r'\{?[0-9A-Fa-f]{8}(-[0-9A-Fa-f]{4}){3}-[0-9A-Fa-f]{12}\}?', swid.strip()) is not None
+            and len(espn_s2.strip()) > 20)
+
+
+# Start loading a league on a worker thread and return its Future. warm_up(snapshot)
+# runs on the same thread afterwards, e.g. to load rankings and name matches, and
+# on_free_agents(names) runs for each page of free agents while they load. The
+# foreground load_league_snapshot() call for the same league waits on this fetch
+# instead of starting another one.
+def prefetch_league(league_id, year, swid, espn_s2, warm_up=None, on_free_agents=None):
+    key = league_cache.key(league_id, year, swid, espn_s2)
+    with _prefetch_lock:
+        future = _prefetches.get(key)
+        if future is not None and not future.done():
+            return future
+
+        def run():
+            try:
+                snapshot = load_league_snapshot(league_id, year, swid, espn_s2, on_free_agents)
+                if warm_up is not None:
+                    warm_up(snapshot)
+                return snapshot
+            except Exception:
+                # The foreground fetch will retry and surface the error to the user
+                logging.getLogger(__name__).warning("League prefetch failed for %s/%s", league_id, year, exc_info=True)
+                return None
+            finally:
+                with _prefetch_lock:
+                    _prefetches.pop(key, None)
+
+        future = _prefetch_executor.submit(run)
+        _prefetches[key] = future
+        return future
+
+
+#########################
+##### Weekly Scores #####
+#########################
+
+# Every team's actual points in one week. games holds both sides of each game as
+# (team_id, opponent_id, points, opponent_points); final is set once ESPN has decided
+# every game, after which the week never changes.
+WeekScores = collections.namedtuple('WeekScores', ['week', 'final', 'games'])
+
+# Weeks of box scores fetched from ESPN at once
+WEEK_SCORE_WORKERS = int(os.environ.get('LEAGUE_WEEK_SCORE_WORKERS', 8))
+
+# Weeks kept in this process; finished ones are also kept in the shared cache backend
+WEEK_SCORE_CACHE_SIZE = 4096
+_week_score_cache = collections.OrderedDict()
+_week_score_cache_lock = threading.Lock()
+
+
+# One week's scores straight from ESPN's scoreboard view, the same request espn_api
+# makes for box_scores() without the player and pro schedule lookups. Games still being
+# played count their live points.
+def fetch_week_scores(league_id, year, swid, espn_s2, week):
+    espn_request = EspnFantasyRequests(sport='nfl', year=year, league_id=league_id, cookies={'espn_s2': espn_s2, 'SWID': swid})
+    filters = {"schedule": {"filterMatchupPeriodIds": {"value": [week]}}}
+    data = espn_request.league_get(params={"view": ["mMatchupScore", "mScoreboard"], "scoringPeriodId": week},
+                                   headers={"x-fantasy-filter": json.dumps(filters)})
+    games, final = [], True
+    for matchup in data.get("schedule", []):
+        final = final and matchup.get("winner", "UNDECIDED") != "UNDECIDED"
+        home, away = matchup.get("home"), matchup.get("away")
+        for side, other in ((home, away), (away, home)):
+            # A bye leaves one side empty
+            if not side:
+                continue
+            points = side.get("totalPointsLive", side.get("totalPoints", 0.0))
+            other_points = other.get("totalPointsLive", other.get("totalPoints", 0.0)) if other else None
+            games.append((side["teamId"], other["teamId"] if other else None, points, other_points))
+    return WeekScores(week, final and bool(games), tuple(games))
+
+
+def _cache_week_scores(key, scores):
+    with _week_score_cache_lock:
+        _week_score_cache[key] = scores
+        _week_score_cache.move_to_end(key)
+        while len(_week_score_cache) > WEEK_SCORE_CACHE_SIZE:
+            _week_score_cache.popitem(last=False)
+
+
+# Scores for every regular season week played so far, the current one included. Finished
+# weeks are cached for good; the week in progress is cached per snapshot, so it's only
+# fetched again when the league is refreshed. Missing weeks are fetched concurrently.
+def league_week_scores(snapshot, swid, espn_s2, workers=WEEK_SCORE_WORKERS):
+    base = league_cache.key(snapshot.league_id, snapshot.year, swid, espn_s2)
+    weeks = range(1, min(snapshot.current_week, snapshot.reg_season_count) + 1)
+    scores, missing = {}, []
+    for week in weeks:
+        final_key, live_key = (*base, week), (*base, week, snapshot.fetched_at)
+        with _week_score_cache_lock:
+            cached = _week_score_cache.get(final_key) or _week_score_cache.get(live_key)
+        if cached is None and shared_cache.is_shared:
+            cached = shared_cache.get('week_scores', ':'.join(map(str, final_key)))
+            if cached is not None:
+                _cache_week_scores(final_key, cached)
+        if cached is None:
+            missing.append(week)
+        else:
+            scores[week] = cached
+
+    if missing:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(workers, len(missing))) as pool:
+            fetched = pool.map(lambda week: fetch_week_scores(snapshot.league_id, snapshot.year, swid, espn_s2, week), missing)
+            for week, week_scores in zip(missing, fetched):
+                scores[week] = week_scores
+                if week_scores.final:
+                    _cache_week_scores((*base, week), week_scores)
+                    if shared_cache.is_shared:
+                        shared_cache.set('week_scores', ':'.join(map(str, (*base, week))), week_scores)
+                else:
+                    _cache_week_scores((*base, week, snapshot.fetched_at), week_scores)
+    return [scores[week] for week in weeks]
+
+
+####################################
+##### Multi-League Async Fetch #####
+####################################
+
+# Most leagues loading at once
+LEAGUE_FETCH_CONCURRENCY = int(os.environ.get('LEAGUE_FETCH_CONCURRENCY', 8))
+
+# One finished league load: snapshot is None when error is set
+LeagueResult = collections.namedtuple('LeagueResult', ['league_id', 'year', 'snapshot', 'error'])
+
+
+async def _load_league_async(league_id, year, swid, espn_s2, limit):
+    key = league_cache.key(league_id, year, swid, espn_s2)
+    snapshot = league_cache.get(key)
+    if snapshot is not None:
+        return snapshot
+
+    # Same path as a single league: shared cache backend, delta refresh, then a full
+    # fetch. espn_api is blocking, so each load runs on a worker thread under the shared limit.
+    async with limit:
+        return await asyncio.to_thread(load_league_snapshot, league_id, year, swid, espn_s2)
+
+
+# Load several leagues concurrently and yield a LeagueResult for each as soon as it is
+# ready, fastest first. One league failing doesn't stop the others.
+async def fetch_leagues(league_ids, year, swid, espn_s2, concurrency=LEAGUE_FETCH_CONCURRENCY):
+    limit = asyncio.Semaphore(concurrency)
+
+    async def load(league_id):
+        try:
+            return LeagueResult(league_id, year, await _load_league_async(league_id, year, swid, espn_s2, limit), None)
+        except Exception as e:
+            return LeagueResult(league_id, year, None, e)
+
+    for result in asyncio.as_completed([load(league_id) for league_id in league_ids]):
+        yield await result
+
+
+# Blocking iterator over fetch_leagues() for Streamlit scripts: the event loop runs on
+# its own thread and results are handed over as they arrive
+def stream_leagues(league_ids, year, swid, espn_s2, concurrency=LEAGUE_FETCH_CONCURRENCY):
+    results = queue.Queue()
+    done = object()
+
+    async def produce():
+        try:
+            async for result in fetch_leagues(league_ids, year, swid, espn_s2, concurrency):
+                results.put(result)
+        finally:
+            results.put(done)
+
+    threading.Thread(target=asyncio.run, args=(produce(),), daemon=True, name='league-stream').start()
+    while True:
+        result = results.get()
+        if result is done:
+            return
+        yield result
@@ -0,0 +1,198 @@
+import json
+import hashlib
+import logging
+import threading
+import collections
+import concurrent.futures
+import numpy as np
+import pandas as pd
+from rankings import RANKINGS_SOURCES, load_rankings, rankings_version, projection_sources
+from valuation import POSITIONS
+
+# Scoring column added to the redraft rankings when they're valued with a league's own settings
+LEAGUE_SCORING = 'League Scoring'
+
+############################
+##### Compiled Scoring #####
+############################
+
+# A league's scoring settings lined up against the stat projection columns: one row of
+# points per stat for each position, plus a last row for players with any other position
+CompiledScoring = collections.namedtuple('CompiledScoring', ['columns', 'weights', 'version'])
+
+
+# Stable hash of scoring settings. position_overrides maps a position to the stats it
+# scores differently, e.g. {'TE': {'REC': 1.5}} for a tight end premium.
+def scoring_hash(scoring_points, position_overrides=None):
+    spec = {'points': dict(scoring_points), 'overrides': {p: dict(o) for p, o in (position_overrides or {}).items()}}
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+# Compile scoring settings for a table with these stat columns. Stats the league doesn't
+# score are weighted zero, as are settings the table has no column for.
+def compile_scoring(columns, scoring_points, position_overrides=None):
+    columns = list(columns)
+    base = np.array([scoring_points.get(column, 0.0) for column in columns], dtype=np.float64)
+    weights = np.tile(base, (len(POSITIONS) + 1, 1))
+    for p, overrides in (position_overrides or {}).items():
+        if p in POSITIONS:
+            row = POSITIONS.index(p)
+            for stat, points in overrides.items():
+                if stat in columns:
+                    weights[row, columns.index(stat)] = points
+    return CompiledScoring(columns, weights, scoring_hash(scoring_points, position_overrides))
+
+
+# Points per game for every player in a stats table in one pass: each player's stat row
+# dotted with their position's weights, over games played when the table has them
+def score_projections(stats, compiled):
+    matrix = np.nan_to_num(stats[compiled.columns].to_numpy(dtype=np.float64))
+    pos = stats['Pos'].to_numpy(dtype=object)
+    rows = np.full(len(pos), len(POSITIONS))
+    for n, p in enumerate(POSITIONS):
+        rows[pos == p] = n
+    points = np.einsum('ij,ij->i', matrix, compiled.weights[rows])
+    if 'Games' in stats:
+        games = stats['Games'].to_numpy(dtype=np.float64)
+        points = np.divide(points, games, out=np.full(len(points), np.nan), where=games > 0)
+    return points
+
+
+##################################
+##### League Scored Rankings #####
+##################################
+
+# Stat projections only take part when a source has been configured
+def stat_projections_available():
+    return 'stats' in RANKINGS_SOURCES
+
+
+# Numeric stat columns of the projections table, i.e. everything that can be scored
+def _stat_columns(stats):
+    return [c for c in stats.columns if c != 'Games' and pd.api.types.is_numeric_dtype(stats[c])]
+
+
+LEAGUE_SCORING_CACHE_SIZE = 16
+_league_scoring_cache = collections.OrderedDict()
+_league_scoring_cache_lock = threading.Lock()
+
+
+# Rankings with a LEAGUE_SCORING column computed from the stat projections and the
+# league's scoring settings, plus a version string to grade against them with. Players
+# are lined up by player_keys(), like the consensus does; anyone without projections
+# gets no value. Cached per scoring hash and per version of both the rankings and the
+# projections.
+def cached_league_scoring(ros, scoring_points, rankings_version_, position_overrides=None):
+    stats_version = rankings_version('stats')
+    key = (rankings_version_, stats_version, scoring_hash(scoring_points, position_overrides))
+    with _league_scoring_cache_lock:
+        if key in _league_scoring_cache:
+            _league_scoring_cache.move_to_end(key)
+            return _league_scoring_cache[key]
+
+    stats = load_rankings('stats')
+    compiled = compile_scoring(_stat_columns(stats), scoring_points, position_overrides)
+    points = score_projections(stats, compiled)
+
+    keys = player_keys(stats)
+    first = ~pd.Series(keys).duplicated().to_numpy()
+    rows = pd.Index(keys[first]).get_indexer(player_keys(ros))
+    scored = ros[['Player Name', 'Team', 'Pos']].copy()
+    scored[LEAGUE_SCORING] = np.where(rows >= 0, points[first][rows], np.nan)
+    result = (scored, ':'.join(['league-scoring', *key]))
+
+    with _league_scoring_cache_lock:
+        _league_scoring_cache[key] = result
+        while len(_league_scoring_cache) > LEAGUE_SCORING_CACHE_SIZE:
+            _league_scoring_cache.popitem(last=False)
+    return result
+
+
+######################################
+##### Blended Projection Sources #####
+######################################
+
+# Name the default rankings go by next to any extra sources
+DEFAULT_SOURCE = 'Default'
+
+
+# Shared player key across sources: lower case name without punctuation or suffixes,
+# plus position, so 'A.J. Brown Jr.' at WR lines up with 'AJ Brown' at WR
+def player_keys(ros):
+    names = (ros['Player Name'].fillna('').astype(str).str.lower()
+             .str.replace(r"[^a-z0-9/ ]", '', regex=True)
+             .str.replace(r"\s+(jr|sr|ii|iii|iv|v)$", '', regex=True)
+             .str.split().str.join(' '))
+    return (names + '|' + ros['Pos'].fillna('').astype(str)).to_numpy(dtype=object)
+
+
+# Load every extra source for a mode at once. A source that has never loaded is left out
+# rather than holding up the others.
+def load_sources(mode):
+    modes = [f'{mode}@{name}' for name in projection_sources(mode)]
+    if not modes:
+        return {}
+
+    def load(source_mode):
+        try:
+            return load_rankings(source_mode), rankings_version(source_mode)
+        except Exception:
+            logging.getLogger(__name__).warning("Couldn't load projection source %s", source_mode, exc_info=True)
+            return None
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(modes)) as pool:
+        loaded = dict(zip(projection_sources(mode), pool.map(load, modes)))
+    return {name: result for name, result in loaded.items() if result is not None}
+
+
+# Weighted mean of every source's value for each player in ros, skipping sources that
+# don't have the player. weights maps source names (DEFAULT_SOURCE for ros itself) to
+# their weight; a player no weighted source has gets no value.
+def consensus_values(ros, scoring, sources, weights):
+    keys = player_keys(ros)
+    columns = [ros[scoring].to_numpy(dtype=np.float64)]
+    column_weights = [weights.get(DEFAULT_SOURCE, 1.0)]
+    for name, source in sources.items():
+        if scoring not in source:
+            continue
+        source_keys = player_keys(source)
+        first = ~pd.Series(source_keys).duplicated().to_numpy()
+        rows = pd.Index(source_keys[first]).get_indexer(keys)
+        values = source[scoring].to_numpy(dtype=np.float64)[first]
+        columns.append(np.where(rows >= 0, values[rows], np.nan))
+        column_weights.append(weights.get(name, 1.0))
+
+    matrix = np.column_stack(columns)
+    present = ~np.isnan(matrix)
+    column_weights = np.asarray(column_weights, dtype=np.float64)
+    total = np.where(present, matrix, 0) @ column_weights
+    weight_sum = present @ column_weights
+    return np.divide(total, weight_sum, out=np.full(len(total), np.nan), where=weight_sum > 0)
+
+
+CONSENSUS_CACHE_SIZE = 16
+_consensus_cache = collections.OrderedDict()
+_consensus_cache_lock = threading.Lock()
+
+
+# Rankings with the scoring column replaced by the weighted consensus of the default
+# rankings and every extra source for the mode, plus a version string to grade against
+# them with. Cached per weights, and rebuilt whenever any one source changes.
+def cached_consensus(ros, mode, scoring, weights, rankings_version_):
+    sources = load_sources(mode)
+    key = (rankings_version_, *(version for _, version in sources.values()), scoring,
+           json.dumps(dict(weights), sort_keys=True))
+    with _consensus_cache_lock:
+        if key in _consensus_cache:
+            _consensus_cache.move_to_end(key)
+            return _consensus_cache[key]
+
+    blended = ros[['Player Name', 'Team', 'Pos']].copy()
+    blended[scoring] = consensus_values(ros, scoring, {name: source for name, (source, _) in sources.items()}, weights)
+    result = (blended, ':'.join(['consensus', *key]))
+
+    with _consensus_cache_lock:
+        _consensus_cache[key] = result
+        while len(_consensus_cache) > CONSENSUS_CACHE_SIZE:
+            _consensus_cache.popitem(last=False)
+    return result
@@ -0,0 +1,327 @@
+import io
+import os
+import sys
+import json
+import logging
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+import contextlib
+import collections
+import numpy as np
+import pandas as pd
+from fuzzywuzzy import process
+from cache_backends import shared_cache
+from http_client import http_client
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: rebuilds are only serialised within a process
+    fcntl = None
+
+####################################
+##### Rankings Sources & Prep ######
+####################################
+
+# GitHub raw URLs for each rankings CSV
+RANKINGS_SOURCES = {
+    'dynasty': 'https://raw.githubusercontent.com/nzylakffa/sleepercalc/main/All%20Dynasty%20Rankings.csv',
+    'redraft': 'https://raw.githubusercontent.com/nzylakffa/sleepercalc/main/All%202024%20Projections.csv',
+}
+
+# Extra rankings to blend with the defaults, as JSON keyed by mode and then source name:
+#   PROJECTION_SOURCES='{"redraft": {"other site": "https://.../projections.csv"}}'
+# Each one must have the same layout as that mode's default rankings and is kept as its
+# own snapshot under '<mode>@<source name>', so source names double as directory names.
+for _mode, _sources in json.loads(os.environ.get('PROJECTION_SOURCES') or '{}').items():
+    for _name, _source in _sources.items():
+        RANKINGS_SOURCES[f'{_mode}@{_name}'] = _source
+
+
+# Names of the extra sources configured for a mode
+def projection_sources(mode):
+    return [key.split('@', 1)[1] for key in RANKINGS_SOURCES if key.startswith(f'{mode}@')]
+
+
+# Optional per-player stat projections, one column per ESPN stat abbreviation (PY, PTD,
+# REC, ...), for valuing players under a league's own scoring settings
+if os.environ.get('STAT_PROJECTIONS_SOURCE'):
+    RANKINGS_SOURCES['stats'] = os.environ['STAT_PROJECTIONS_SOURCE']
+
+# Scoring columns available for each mode
+SCORING_COLUMNS = {
+    'dynasty': ['1 QB', 'SuperFlex', 'Tight End Premium', 'SuperFlex & Tight End Premium'],
+    'redraft': ['PPR', 'Half', 'Std', '1.5 TE', '6 Pt Pass'],
+}
+
+# Replace defense names
+DST_REPLACE_DICT = {'Ravens D/ST': 'BAL D/ST', 'Cowboys D/ST': 'DAL D/ST', 'Bills D/ST': 'BUF D/ST', 'Jets D/ST': 'NYJ D/ST', 'Dolphins D/ST': 'MIA D/ST',
+                    'Browns D/ST': 'CLE D/ST', 'Raiders D/ST': 'LVR D/ST', 'Saints D/ST': 'NO D/ST', '49ers D/ST': 'SF D/ST', 'Colts D/ST': 'IND D/ST',
+                    'Steelers D/ST': 'PIT D/ST', 'Bucs D/ST': 'TB D/ST', 'Chiefs D/ST': 'KC D/ST', 'Texans D/ST': 'HOU D/ST', 'Giants D/ST': 'NYG D/ST',
+                    'Vikings D/ST': 'MIN D/ST', 'Jaguars D/ST': 'JAX D/ST', 'Bengals D/ST': 'CIN D/ST', 'Bears D/ST': 'CHI D/ST', 'Broncos D/ST': 'DEN D/ST',
+                    'Packers D/ST': 'GB D/ST', 'Chargers D/ST': 'LAC D/ST', 'Lions D/ST': 'DET D/ST', 'Seahawks D/ST': 'SEA D/ST', 'Patriots D/ST': 'NE D/ST',
+                    'Falcons D/ST': 'ATL D/ST', 'Eagles D/ST': 'PHI D/ST', 'Titans D/ST': 'TEN D/ST', 'Rams D/ST': 'LAR D/ST', 'Panthers D/ST': 'NE D/ST',
+                    'Cardinals D/ST': 'ARI D/ST', 'Commanders D/ST': 'WAS D/ST'}
+
+
+# Apply the per-mode cleanup the app used to do after every read_csv
+def prepare_rankings(ros, mode):
+    # Extra sources are prepared like their mode's default rankings
+    mode = mode.split('@', 1)[0]
+    if mode == 'dynasty':
+        # Rename Columns
+        ros = ros.rename(columns={'Player': 'Player Name',
+                                  'TEP': 'Tight End Premium',
+                                  'SF TEP': 'SuperFlex & Tight End Premium',
+                                  'SF': 'SuperFlex',
+                                  'Position': 'Pos'})
+    elif mode == 'redraft':
+        # Make numbers per game
+        for col in SCORING_COLUMNS['redraft']:
+            ros[col] = ros[col]/ros['Games']
+
+    ros['Player Name'] = ros['Player Name'].replace(DST_REPLACE_DICT)
+    return ros
+
+
+##################################
+##### Memory-Mapped Snapshot #####
+##################################
+
+# Snapshots live next to the app unless told otherwise
+SNAPSHOT_DIR = os.environ.get('RANKINGS_SNAPSHOT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.rankings_snapshots'))
+
+# Rebuild a snapshot once it is older than this many seconds
+SNAPSHOT_MAX_AGE = int(os.environ.get('RANKINGS_SNAPSHOT_MAX_AGE', 3600))
+
+# Old snapshot builds younger than this are left alone when sweeping
+SNAPSHOT_SWEEP_AGE = 60
+
+# One lock per mode, so several sources can be built and loaded at once
+_snapshot_locks = collections.defaultdict(threading.Lock)
+_snapshot_locks_lock = threading.Lock()
+_loaded_snapshots = {}
+# When each mode may try again after a failed rebuild
+_retry_after = {}
+
+
+def _snapshot_lock(mode):
+    with _snapshot_locks_lock:
+        return _snapshot_locks[mode]
+
+
+def _snapshot_path(mode):
+    return os.path.join(SNAPSHOT_DIR, mode)
+
+
+# Held while a mode is rebuilt, so worker processes sharing SNAPSHOT_DIR take turns
+# rather than all downloading and building the same snapshot at once
+@contextlib.contextmanager
+def _rebuild_lock(mode):
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    with open(os.path.join(SNAPSHOT_DIR, f'.{mode}.lock'), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+# Raw bytes of a rankings CSV, from disk or through the shared HTTP client
+def _download(source):
+    if source.startswith(('http://', 'https://')):
+        response = http_client.get(source)
+        response.raise_for_status()
+        return response.content
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+# Read a rankings CSV. With a shared cache backend the raw file is fetched once and
+# reused by every replica until the snapshot would be rebuilt anyway.
+def _read_source(source):
+    if not shared_cache.is_shared:
+        return pd.read_csv(io.BytesIO(_download(source)))
+    return pd.read_csv(io.BytesIO(shared_cache.get_or_set('rankings-csv', source, lambda: _download(source), ttl=SNAPSHOT_MAX_AGE)))
+
+
+# Convert one rankings source into a columnar snapshot:
+#   values.npy - every numeric column as one float64 matrix (players x columns)
+#   <n>.npy    - each text column as a fixed width unicode array ('' means missing)
+#   meta.json  - column layout, source url and build time
+def build_snapshot(mode, source=None):
+    source = source or RANKINGS_SOURCES[mode]
+    ros = prepare_rankings(_read_source(source), mode)
+
+    numeric_cols = [c for c in ros.columns if pd.api.types.is_numeric_dtype(ros[c])]
+    text_cols = [c for c in ros.columns if c not in numeric_cols]
+
+    # Write into a temp dir first and swap it in, so readers never see half a snapshot
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f'.{mode}-', dir=SNAPSHOT_DIR)
+    np.save(os.path.join(tmp_dir, 'values.npy'), np.ascontiguousarray(ros[numeric_cols].to_numpy(dtype=np.float64)))
+    for n, col in enumerate(text_cols):
+        np.save(os.path.join(tmp_dir, f'{n}.npy'), ros[col].fillna('').astype(str).to_numpy(dtype=str))
+
+    meta = {'mode': mode,
+            'source': source,
+            'built_at': time.time(),
+            'columns': list(ros.columns),
+            'numeric_columns': numeric_cols,
+            'text_columns': text_cols}
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+    # The mode's path is a symlink to the current build, and renaming a new link over it
+    # swaps builds in one step. Snapshots from before the link are moved aside once.
+    final_dir = _snapshot_path(mode)
+    if os.path.isdir(final_dir) and not os.path.islink(final_dir):
+        os.replace(final_dir, os.path.join(SNAPSHOT_DIR, f'.{mode}-unlinked-{os.getpid()}'))
+    previous = os.path.basename(os.path.realpath(final_dir)) if os.path.islink(final_dir) else None
+    tmp_link = os.path.join(SNAPSHOT_DIR, f'.{mode}-link-{os.getpid()}-{threading.get_ident()}')
+    os.symlink(os.path.basename(tmp_dir), tmp_link)
+    os.replace(tmp_link, final_dir)
+
+    # Readers that resolved the previous build a moment ago may still be opening it, so
+    # it's kept until the next rebuild. Older builds go, unless they're so new that
+    # another process may still be writing them.
+    keep = {os.path.basename(tmp_dir), previous}
+    for name in os.listdir(SNAPSHOT_DIR):
+        path = os.path.join(SNAPSHOT_DIR, name)
+        if (name.startswith(f'.{mode}-') and name not in keep and not os.path.islink(path)
+                and time.time() - os.path.getmtime(path) > SNAPSHOT_SWEEP_AGE):
+            shutil.rmtree(path, ignore_errors=True)
+    return meta
+
+
+# Map a snapshot read-only. The numeric matrix stays backed by the file, so every
+# session and worker process shares the same pages through the OS page cache.
+def _open_snapshot(mode):
+    # Resolve the link once, so every file comes from the same build
+    path = os.path.realpath(_snapshot_path(mode))
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+
+    values = np.load(os.path.join(path, 'values.npy'), mmap_mode='r')
+    ros = pd.DataFrame(values, columns=meta['numeric_columns'], copy=False)
+    # Insert text columns in place rather than reordering, which would copy the matrix
+    for n, col in enumerate(meta['text_columns']):
+        text = np.load(os.path.join(path, f'{n}.npy'), mmap_mode='r').astype(object)
+        text[text == ''] = np.nan
+        ros.insert(meta['columns'].index(col), col, text)
+    return ros, meta
+
+
+def _snapshot_is_stale(mode):
+    meta_path = os.path.join(_snapshot_path(mode), 'meta.json')
+    if not os.path.exists(meta_path):
+        return True
+    if time.time() < _retry_after.get(mode, 0):
+        return False
+    return time.time() - os.path.getmtime(meta_path) > SNAPSHOT_MAX_AGE
+
+
+# Process-wide rankings for a mode. Every caller gets the same read-only DataFrame,
+# so it must never be modified in place.
+def load_rankings(mode):
+    meta_path = os.path.join(_snapshot_path(mode), 'meta.json')
+    with _snapshot_lock(mode):
+        if _snapshot_is_stale(mode):
+            with _rebuild_lock(mode):
+                # Another process may have rebuilt it while this one waited for the lock
+                if _snapshot_is_stale(mode):
+                    try:
+                        build_snapshot(mode)
+                    except Exception:
+                        # Keep serving the last good snapshot if the source can't be reached, and
+                        # don't try again for a while rather than on every call
+                        if not os.path.exists(meta_path):
+                            raise
+                        logging.getLogger(__name__).warning("Couldn't rebuild %s rankings, serving the last snapshot", mode, exc_info=True)
+                        _retry_after[mode] = time.time() + SNAPSHOT_MAX_AGE
+        mtime = os.path.getmtime(meta_path)
+        loaded = _loaded_snapshots.get(mode)
+        if loaded is None or loaded[0] != mtime:
+            ros, meta = _open_snapshot(mode)
+            loaded = (mtime, ros, meta, NameMatcher(ros['Player Name']))
+            _loaded_snapshots[mode] = loaded
+        return loaded[1]
+
+
+# Changes whenever the rankings served for a mode are rebuilt
+def rankings_version(mode):
+    load_rankings(mode)
+    return f"{mode}:{_loaded_snapshots[mode][2]['built_at']}"
+
+
+# Name matcher for the rankings currently served for a mode
+def name_matcher(mode):
+    load_rankings(mode)
+    return _loaded_snapshots[mode][3]
+
+
+_warmed = set()
+_warmed_lock = threading.Lock()
+
+
+# Load every rankings mode and match the given names against each, so whichever
+# mode the user picks is already warm. With a key (e.g. a league snapshot version) the
+# names are only matched once per key and rankings version.
+def warm_rankings(names, modes=SCORING_COLUMNS, key=None):
+    for mode in modes:
+        matcher = name_matcher(mode)
+        if key is not None:
+            warmed_key = (key, rankings_version(mode))
+            with _warmed_lock:
+                if warmed_key in _warmed:
+                    continue
+        for name in names:
+            matcher(name)
+        if key is not None:
+            with _warmed_lock:
+                _warmed.add(warmed_key)
+
+
+#########################
+##### Name Matching #####
+#########################
+
+# Fuzzy matches roster names against one set of rankings names. Results are kept
+# per process and, with a shared cache backend, across replicas. The version is a
+# hash of the names, so rebuilt snapshots with the same players keep their matches.
+class NameMatcher:
+    def __init__(self, choices):
+        self.choices = list(choices)
+        self.version = hashlib.sha1('\n'.join(map(str, self.choices)).encode()).hexdigest()
+        self._matches = {}
+        self._lock = threading.Lock()
+
+    # Same call shape as process.extractOne; choices is ignored in favour of our own
+    def __call__(self, player_name, choices=None):
+        with self._lock:
+            if player_name in self._matches:
+                return self._matches[player_name]
+
+        key = f"{self.version}:{player_name}"
+        match = shared_cache.get('name-match', key) if shared_cache.is_shared else None
+        if match is None:
+            match = process.extractOne(player_name, self.choices)
+            if shared_cache.is_shared:
+                shared_cache.set('name-match', key, match)
+
+        with self._lock:
+            self._matches[player_name] = match
+        return match
+
+
+# Build step: python rankings.py [dynasty] [redraft]
+if __name__ == '__main__':
+    for mode in sys.argv[1:] or list(RANKINGS_SOURCES):
+        meta = build_snapshot(mode)
+        print(f"Built {mode} snapshot with {len(meta['columns'])} columns from {meta['source']}")
@@ -0,0 +1,299 @@
+import os
+import zlib
+import threading
+import collections
+import concurrent.futures
+import numpy as np
+import pandas as pd
+from valuation import weekly_lineup_points
+
+# Simulated weeks per trade evaluation
+TRADE_SIMULATIONS = int(os.environ.get('TRADE_SIMULATIONS', 10000))
+
+# Week to week spread of a player's score as a share of their rankings value. Rankings
+# only carry a single value per player, so the spread comes from the position.
+POSITION_CV = {"QB": .35, "RB": .5, "WR": .55, "TE": .6, "K": .4, "D/ST": .6}
+
+# Result of simulating a trade. Win probabilities are against the rest of the league
+# in a single week; deltas are after minus before, with 95% confidence intervals.
+TradeOutlook = collections.namedtuple('TradeOutlook', ['n_sims', 'my_win_prob', 'my_win_prob_delta', 'my_win_prob_ci',
+                                                       'partner_win_prob', 'partner_win_prob_delta', 'partner_win_prob_ci',
+                                                       'my_points_delta', 'my_points_ci', 'partner_points_delta', 'partner_points_ci',
+                                                       'my_better_weeks'])
+
+
+##########################
+##### Weekly Scoring #####
+##########################
+
+# Common random numbers: one standard normal column per player name, shared by every
+# roster the player appears on, so before and after lineups see the same weeks
+def player_draws(names, n_sims, seed=0):
+    names = list(dict.fromkeys(name for name in names if isinstance(name, str)))
+    # Each player's stream is seeded by their name, so a player draws the same weeks
+    # whichever rosters are being simulated alongside them
+    z = np.zeros((max(len(names), 1), n_sims))
+    for i, name in enumerate(names):
+        z[i] = np.random.default_rng([seed, zlib.crc32(name.encode())]).standard_normal(n_sims)
+    return {name: i for i, name in enumerate(names)}, z.T
+
+
+# Sampled weekly scores for a roster, one column per player. Scores can't go below zero
+# and players missing from the rankings score nothing.
+def sample_scores(values, scoring, columns, z):
+    pos = values['Pos'].to_numpy(dtype=object)
+    mean = np.nan_to_num(values[scoring].to_numpy(dtype=np.float64))
+    cv = np.array([POSITION_CV.get(p, 0) for p in pos])
+    # Unranked players have no name and a zero mean, so any column will do for them
+    draws = z[:, [columns.get(name, 0) for name in values['Player Name']]]
+    return pos, np.maximum(mean + mean*cv*draws, 0)
+
+
+# Best lineup score in every simulated week at once, with the same slot rules as the
+# weekly lineups (kickers start, since this is a weekly score rather than a grade)
+def lineup_points(pos, scores, slots):
+    return weekly_lineup_points(pos, scores, slots)[0]
+
+
+# Mean and 95% confidence interval of the mean for paired per-week differences
+def _mean_ci(samples):
+    mean = samples.mean()
+    half_width = 1.96*samples.std(ddof=1)/np.sqrt(len(samples))
+    return mean, (mean - half_width, mean + half_width)
+
+
+#########################
+##### Trade Outlook #####
+#########################
+
+# Share of the other teams each team outscores, week by week
+def _weekly_win_share(points, team):
+    others = [other for other in points if other != team]
+    if not others:
+        return np.full(len(points[team]), .5)
+    return np.mean([points[team] > points[other] for other in others], axis=0)
+
+
+# Simulate a trade over n_sims weeks. league_values maps every team to its current
+# values frame; my_after and partner_after are the two post-trade rosters. Everything
+# shares one set of draws, so the before/after differences are measured week by week.
+def simulate_trade(league_values, my_team, partner, my_after, partner_after, scoring, slots, n_sims=TRADE_SIMULATIONS, seed=0):
+    names = [name for values in [*league_values.values(), my_after, partner_after] for name in values['Player Name']]
+    columns, z = player_draws(names, n_sims, seed)
+
+    before = {team: lineup_points(*sample_scores(values, scoring, columns, z), slots) for team, values in league_values.items()}
+    after = dict(before)
+    after[my_team] = lineup_points(*sample_scores(my_after, scoring, columns, z), slots)
+    after[partner] = lineup_points(*sample_scores(partner_after, scoring, columns, z), slots)
+
+    my_wins = _weekly_win_share(after, my_team)
+    partner_wins = _weekly_win_share(after, partner)
+    my_win_delta, my_win_ci = _mean_ci(my_wins - _weekly_win_share(before, my_team))
+    partner_win_delta, partner_win_ci = _mean_ci(partner_wins - _weekly_win_share(before, partner))
+    my_points_delta, my_points_ci = _mean_ci(after[my_team] - before[my_team])
+    partner_points_delta, partner_points_ci = _mean_ci(after[partner] - before[partner])
+
+    return TradeOutlook(n_sims=n_sims,
+                        my_win_prob=my_wins.mean(),
+                        my_win_prob_delta=my_win_delta, my_win_prob_ci=my_win_ci,
+                        partner_win_prob=partner_wins.mean(),
+                        partner_win_prob_delta=partner_win_delta, partner_win_prob_ci=partner_win_ci,
+                        my_points_delta=my_points_delta, my_points_ci=my_points_ci,
+                        partner_points_delta=partner_points_delta, partner_points_ci=partner_points_ci,
+                        my_better_weeks=np.mean(after[my_team] > before[my_team]))
+
+
+#############################
+##### Season Simulation #####
+#############################
+
+# Seasons simulated per league snapshot, split across worker threads (NumPy releases
+# the GIL for the heavy array work)
+SEASON_SIMULATIONS = int(os.environ.get('SEASON_SIMULATIONS', 20000))
+SEASON_SIM_WORKERS = min(os.cpu_count() or 1, 8)
+
+# Simulated weeks used to estimate each team's weekly score distribution
+STRENGTH_SIMULATIONS = 2000
+
+# A team's weekly score as a normal distribution
+TeamStrength = collections.namedtuple('TeamStrength', ['mean', 'sd'])
+
+# Per team playoff and title probabilities and average final wins
+SeasonOdds = collections.namedtuple('SeasonOdds', ['playoffs', 'championship', 'wins'])
+
+# One set of simulated seasons for given team strengths: every game's result and every
+# team's final points for, kept so a trade only has to redo the games it touches
+SeasonRun = collections.namedtuple('SeasonRun', ['mean', 'sd', 'results', 'points'])
+
+
+# Weekly score distribution of a roster's best lineup, from the same sampled weeks the
+# trade simulation uses
+def team_strength(values, scoring, slots, n_sims=STRENGTH_SIMULATIONS, seed=0):
+    columns, z = player_draws(values['Player Name'], n_sims, seed)
+    points = lineup_points(*sample_scores(values, scoring, columns, z), slots)
+    return TeamStrength(points.mean(), points.std())
+
+
+# Rankings values aren't always on the fantasy points scale (dynasty values aren't), so
+# strengths are scaled to the league's actual points per game. Needed for the points
+# tiebreaker.
+def strength_scale(strengths, state):
+    games = sum(state.games_played)
+    model_mean = np.mean([strength.mean for strength in strengths])
+    if games == 0 or model_mean <= 0:
+        return 1.0
+    return (sum(state.points_for)/games)/model_mean
+
+
+# Monte Carlo of the rest of the regular season and the playoffs. Every random draw is
+# made up front and kept, so re-running with different team strengths reuses them.
+class SeasonSimulation:
+    def __init__(self, state, n_sims=SEASON_SIMULATIONS, seed=0):
+        self.state = state
+        self.n_sims = n_sims
+        index = {team_id: i for i, team_id in enumerate(state.team_ids)}
+        weeks = sorted({week for week, _, _ in state.games})
+        week_index = {week: i for i, week in enumerate(weeks)}
+        self.game_week = np.array([week_index[week] for week, _, _ in state.games], dtype=np.intp)
+        self.game_home = np.array([index[home] for _, home, _ in state.games], dtype=np.intp)
+        self.game_away = np.array([index[away] for _, _, away in state.games], dtype=np.intp)
+        n_teams = len(state.team_ids)
+        self.home_onehot = np.eye(n_teams)[self.game_home]
+        self.away_onehot = np.eye(n_teams)[self.game_away]
+        self.playoff_teams = max(min(state.playoff_team_count, n_teams), 1)
+        self.playoff_rounds = int(np.ceil(np.log2(self.playoff_teams))) if self.playoff_teams > 1 else 0
+
+        rng = np.random.default_rng(seed)
+        self.season_z = rng.standard_normal((n_sims, len(weeks), n_teams), dtype=np.float32)
+        self.playoff_z = rng.standard_normal((n_sims, self.playoff_rounds, n_teams), dtype=np.float32)
+
+    # Each game's result in every simulated season: 1 home win, 0 away win, .5 tie
+    def game_results(self, sims, mean, sd, games=slice(None)):
+        week, home, away = self.game_week[games], self.game_home[games], self.game_away[games]
+        home_score = mean[home] + sd[home]*self.season_z[sims, week, home]
+        away_score = mean[away] + sd[away]*self.season_z[sims, week, away]
+        return (home_score > away_score) + .5*(home_score == away_score)
+
+    # Final points for of the given teams in every simulated season
+    def season_points(self, sims, mean, sd, teams=slice(None)):
+        scores = mean + sd*self.season_z[sims]
+        return np.asarray(self.state.points_for)[teams] + (scores[:, self.game_week, self.game_home] @ self.home_onehot[:, teams]
+                                                           + scores[:, self.game_week, self.game_away] @ self.away_onehot[:, teams])
+
+    # Every game and every team's points, split across the worker threads
+    def simulate(self, strengths):
+        mean = np.array([strength.mean for strength in strengths])
+        sd = np.array([strength.sd for strength in strengths])
+        bounds = np.linspace(0, self.n_sims, SEASON_SIM_WORKERS + 1).astype(int)
+        chunks = [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=SEASON_SIM_WORKERS) as pool:
+            parts = list(pool.map(lambda sims: (self.game_results(sims, mean, sd), self.season_points(sims, mean, sd)), chunks))
+        return SeasonRun(mean, sd, np.concatenate([results for results, _ in parts]), np.concatenate([points for _, points in parts]))
+
+    # Same seasons with new strengths for a few teams. Only the games those teams play
+    # are re-simulated; every other game keeps its result from base.
+    def resimulate(self, base, new_strengths):
+        mean, sd = base.mean.copy(), base.sd.copy()
+        teams = np.array(list(new_strengths), dtype=np.intp)
+        for team, strength in new_strengths.items():
+            mean[team], sd[team] = strength
+        games = np.flatnonzero(np.isin(self.game_home, teams) | np.isin(self.game_away, teams))
+
+        results = base.results.copy()
+        results[:, games] = self.game_results(slice(None), mean, sd, games)
+        points = base.points.copy()
+        points[:, teams] = self.season_points(slice(None), mean, sd, teams)
+        return SeasonRun(mean, sd, results, points)
+
+    # Seed by wins, then points for. Returns team indices in seed order for each season.
+    def seeds(self, wins, points):
+        # Points only break ties: they're squeezed below half a win
+        key = wins + points/(2*(np.abs(points).max(axis=1, keepdims=True) + 1))
+        return np.argsort(-key, axis=1, kind='stable')
+
+    # Single elimination among the playoff teams, top seeds getting byes when the field
+    # isn't a power of two, and the bracket reseeded every round. Returns the champions.
+    def champions(self, mean, sd, seeds):
+        alive = np.tile(np.arange(self.playoff_teams), (seeds.shape[0], 1))
+        for playoff_round in range(self.playoff_rounds):
+            n_alive = alive.shape[1]
+            byes = 2**int(np.ceil(np.log2(n_alive))) - n_alive
+            n_games = (n_alive - byes)//2
+            high = alive[:, byes:byes + n_games]
+            low = alive[:, byes + n_games:][:, ::-1]
+            high_team = np.take_along_axis(seeds, high, axis=1)
+            low_team = np.take_along_axis(seeds, low, axis=1)
+            z = self.playoff_z[:, playoff_round]
+            high_score = mean[high_team] + sd[high_team]*np.take_along_axis(z, high_team, axis=1)
+            low_score = mean[low_team] + sd[low_team]*np.take_along_axis(z, low_team, axis=1)
+            winners = np.where(high_score >= low_score, high, low)
+            alive = np.sort(np.concatenate([alive[:, :byes], winners], axis=1), axis=1)
+        return np.take_along_axis(seeds, alive[:, :1], axis=1)[:, 0]
+
+    # Playoff odds, title odds and average final wins per team
+    def odds(self, run):
+        n_teams = len(self.state.team_ids)
+        wins = np.asarray(self.state.wins) + run.results @ self.home_onehot + (1 - run.results) @ self.away_onehot
+        seeds = self.seeds(wins, run.points)
+        made_playoffs = np.bincount(seeds[:, :self.playoff_teams].ravel(), minlength=n_teams)
+        titles = np.bincount(self.champions(run.mean, run.sd, seeds), minlength=n_teams)
+        return SeasonOdds(made_playoffs/self.n_sims, titles/self.n_sims, wins.mean(axis=0))
+
+
+SEASON_CACHE_SIZE = 8
+_season_cache = collections.OrderedDict()
+_season_cache_lock = threading.Lock()
+
+
+# Simulation, baseline run and strength scale for a league, cached per snapshot,
+# rankings and settings. league_values maps team names to values frames.
+def _cached_season(state, league_values, scoring, slots, snapshot_version, rankings_version, n_sims):
+    key = (snapshot_version, rankings_version, scoring, tuple(slots), n_sims)
+    with _season_cache_lock:
+        if key in _season_cache:
+            _season_cache.move_to_end(key)
+            return _season_cache[key]
+
+    strengths = [team_strength(league_values[name], scoring, slots) for name in state.team_names]
+    scale = strength_scale(strengths, state)
+    simulation = SeasonSimulation(state, n_sims)
+    base = simulation.simulate([TeamStrength(mean*scale, sd*scale) for mean, sd in strengths])
+    entry = (simulation, base, simulation.odds(base), scale)
+
+    with _season_cache_lock:
+        _season_cache[key] = entry
+        while len(_season_cache) > SEASON_CACHE_SIZE:
+            _season_cache.popitem(last=False)
+    return entry
+
+
+# Playoff and championship odds for every team, best first
+def cached_season_odds(state, league_values, scoring, slots, snapshot_version, rankings_version, n_sims=SEASON_SIMULATIONS):
+    _, _, odds, _ = _cached_season(state, league_values, scoring, slots, snapshot_version, rankings_version, n_sims)
+    table = pd.DataFrame({'Team': state.team_names,
+                          'Wins': state.wins,
+                          'Projected Wins': np.round(odds.wins, 1),
+                          'Playoff %': np.round(odds.playoffs*100, 1),
+                          'Championship %': np.round(odds.championship*100, 1)})
+    return table.sort_values(by=['Playoff %', 'Championship %'], ascending=False).reset_index(drop=True)
+
+
+# How a trade changes playoff and title odds. new_values maps the traded teams' names to
+# their post-trade values frames. The seasons are the cached ones, so the difference
+# comes from the trade rather than from new random draws.
+def trade_season_impact(state, league_values, new_values, scoring, slots, snapshot_version, rankings_version, n_sims=SEASON_SIMULATIONS):
+    simulation, base, before, scale = _cached_season(state, league_values, scoring, slots, snapshot_version, rankings_version, n_sims)
+    new_strengths = {}
+    for name, values in new_values.items():
+        mean, sd = team_strength(values, scoring, slots)
+        new_strengths[state.team_names.index(name)] = TeamStrength(mean*scale, sd*scale)
+    after = simulation.odds(simulation.resimulate(base, new_strengths))
+
+    rows = [state.team_names.index(name) for name in new_values]
+    return pd.DataFrame({'Team': list(new_values),
+                         'Playoff % Before': np.round(before.playoffs[rows]*100, 1),
+                         'Playoff % After': np.round(after.playoffs[rows]*100, 1),
+                         'Playoff % Change': np.round((after.playoffs[rows] - before.playoffs[rows])*100, 1),
+                         'Championship % Before': np.round(before.championship[rows]*100, 1),
+                         'Championship % After': np.round(after.championship[rows]*100, 1),
+                         'Championship % Change': np.round((after.championship[rows] - before.championship[rows])*100, 1)})
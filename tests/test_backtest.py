@@ -0,0 +1,29 @@
+import pandas as pd
+from backtest import _week_values, parameter_grid, score_grades, season_slots
+
+
+def test_season_slots_take_the_most_of_each_slot_any_team_used():
+    lineups = pd.DataFrame({'week': [1, 1, 1, 2, 2], 'team_id': [1, 1, 1, 1, 1],
+                            'slot': ['QB', 'RB', 'RB', 'RB', 'BE']})
+    slots = season_slots(lineups)
+    assert (slots.qb, slots.rb, slots.bench, slots.wr) == (1, 2, 1, 0)
+
+
+def test_score_grades_counts_games_the_higher_grade_won():
+    grid = parameter_grid(bench_multipliers=[1], bench_weights=['lineup'], value_bases=['projected'])
+    grades = pd.DataFrame({'league_id': 1, 'season': 2023, 'week': [1, 1, 2, 2], 'team_id': [1, 2, 1, 2],
+                           'combo': 0, 'grade': [100.0, 90.0, 80.0, 95.0]})
+    matchups = pd.DataFrame({'league_id': 1, 'season': 2023, 'week': [1, 1, 2, 2], 'team_id': [1, 2, 1, 2],
+                             'opponent_id': [2, 1, 2, 1], 'points': [110.0, 100.0, 120.0, 90.0],
+                             'opponent_points': [100.0, 110.0, 90.0, 120.0], 'is_playoff': 0})
+    summary = score_grades(grades, matchups, grid)
+    assert summary.loc[0, 'win accuracy'] == 0.5
+    assert summary.loc[0, 'team weeks'] == 4
+
+
+def test_trailing_values_leave_byes_out_of_the_average():
+    lineups = pd.DataFrame({'week': [1, 2, 3, 4], 'team_id': 1, 'player_id': 7, 'position': 'WR', 'slot': 'WR',
+                            'points': [10.0, 0.0, 20.0, 5.0], 'projected_points': [12.0, 0.0, 14.0, 13.0]})
+    values = _week_values(lineups).set_index('week')
+    # Week 1 has nothing earlier, and the week 2 bye doesn't drag the average down
+    assert values['trailing'].tolist() == [12.0, 10.0, 10.0, 15.0]
@@ -0,0 +1,21 @@
+import logging
+import types
+import history
+
+
+def _league(error):
+    def transactions(scoring_period, types):
+        raise error
+    return types.SimpleNamespace(league_id=1, year=2024, transactions=transactions)
+
+
+def test_week_without_transactions_is_empty_and_quiet(caplog):
+    with caplog.at_level(logging.WARNING, logger='history'):
+        assert history._week_transactions(_league(Exception(history.NO_TRANSACTIONS_MESSAGE)), 3) == []
+    assert not caplog.records
+
+
+def test_other_transaction_errors_are_logged(caplog):
+    with caplog.at_level(logging.WARNING, logger='history'):
+        assert history._week_transactions(_league(AttributeError('transactions')), 3) == []
+    assert caplog.records and caplog.records[0].exc_info
@@ -0,0 +1,125 @@
+import pytest
+import requests
+import http_client
+from http_client import CircuitBreaker, CircuitOpenError, HttpClient
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(http_client.time, 'monotonic', clock)
+    return clock
+
+
+def test_breaker_opens_after_threshold_failures(clock):
+    breaker = CircuitBreaker(threshold=3, cooldown=30)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record(False)
+    assert breaker.allow()
+    breaker.record(False)
+    assert not breaker.allow()
+
+
+def test_half_open_breaker_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=30)
+    breaker.record(False)
+    assert not breaker.allow()
+    clock.now += 30
+    assert breaker.allow()
+    assert not breaker.allow() and not breaker.allow()
+
+
+@pytest.mark.parametrize('probe_ok, allowed_after', [(True, True), (False, False)])
+def test_probe_result_closes_or_reopens_the_breaker(clock, probe_ok, allowed_after):
+    breaker = CircuitBreaker(threshold=3, cooldown=30)
+    for _ in range(3):
+        breaker.record(False)
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record(probe_ok)
+    assert breaker.allow() is allowed_after
+    assert breaker.allow() is allowed_after
+
+
+def test_probe_that_never_reports_back_is_replaced_after_a_cooldown(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=30)
+    breaker.record(False)
+    clock.now += 30
+    assert breaker.allow()
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+class FakeSession:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append(method)
+        status = self.statuses.pop(0)
+        if status is None:
+            raise requests.exceptions.Timeout('timed out')
+        response = requests.Response()
+        response.status_code = status
+        return response
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(http_client.time, 'sleep', sleeps.append)
+    monkeypatch.setattr(http_client.random, 'uniform', lambda low, high: high)
+    return sleeps
+
+
+def _client(statuses, **kwargs):
+    client = HttpClient(backoff=0.5, max_backoff=3, breaker_threshold=100, **kwargs)
+    client.session = FakeSession(statuses)
+    return client
+
+
+def test_get_retries_with_capped_exponential_backoff(sleeps):
+    client = _client([503, None, 502, 500, 200], max_retries=4)
+    assert client.get('https://example.com/x').status_code == 200
+    assert len(client.session.calls) == 5
+    assert sleeps == [0.5, 1.0, 2.0, 3]
+    assert client.metrics()['example.com/x'].retries == 4
+
+
+def test_retries_stop_at_max_retries(sleeps):
+    client = _client([503]*5, max_retries=2)
+    assert client.get('https://example.com/x').status_code == 503
+    assert len(client.session.calls) == 3
+
+
+def test_post_is_not_retried_unless_marked_idempotent(sleeps):
+    client = _client([503, 200])
+    assert client.post('https://example.com/x').status_code == 503
+    assert client.session.calls == ['POST'] and sleeps == []
+
+    client = _client([503, 200])
+    assert client.post('https://example.com/x', idempotent=True).status_code == 200
+    assert client.session.calls == ['POST', 'POST']
+
+
+def test_open_breaker_fails_fast(sleeps):
+    client = HttpClient(max_retries=0, breaker_threshold=2, breaker_cooldown=30)
+    client.session = FakeSession([None, None, 200])
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.Timeout):
+            client.get('https://example.com/x')
+    with pytest.raises(CircuitOpenError):
+        client.get('https://example.com/x')
+    assert len(client.session.calls) == 2
@@ -0,0 +1,209 @@
+import threading
+import pytest
+import league_data
+from league_data import DELTA_MAX_AGE, FrozenDict, LeagueCache, LeagueSnapshot, load_league_snapshot
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _snapshot(fetched_at, current_week):
+    return LeagueSnapshot(league_id=1, year=2024, name='League', fetched_at=fetched_at, current_week=current_week, team_count=0,
+                          reg_season_count=14, playoff_team_count=4, teams=(), standings=(), players=FrozenDict(),
+                          free_agents=FrozenDict(), bye_weeks=FrozenDict(), full_fetched_at=fetched_at)
+
+
+def test_delta_refresh_falls_back_to_a_full_fetch_once_too_old(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(league_data.time, 'time', clock)
+    monkeypatch.setattr(league_data, 'league_cache', LeagueCache(max_bytes=1 << 20, ttl=3600))
+    calls = {'full': 0, 'delta': 0}
+
+    def full_fetch(league_id, year, swid, espn_s2, on_free_agents=None):
+        calls['full'] += 1
+        return _snapshot(clock.now, calls['full'])
+
+    def delta(snapshot, swid, espn_s2):
+        calls['delta'] += 1
+        return snapshot._replace(fetched_at=clock.now)
+
+    monkeypatch.setattr(league_data, 'fetch_league_snapshot', full_fetch)
+    monkeypatch.setattr(league_data, 'refresh_league_snapshot', delta)
+
+    # A load every two hours for two days
+    for _ in range(24):
+        snapshot = load_league_snapshot(1, 2024, 'swid', 's2')
+        assert clock.now - snapshot.full_fetched_at <= DELTA_MAX_AGE
+        clock.now += 2*3600
+
+    expected_full = -(-48*3600 // (DELTA_MAX_AGE + 2*3600))
+    assert calls['full'] >= expected_full > 1
+    assert calls['delta'] > 0
+    assert snapshot.current_week == calls['full']
+
+
+def test_delta_refresh_keeps_the_full_fetch_time():
+    snapshot = _snapshot(100.0, 1)
+    refreshed = league_data.apply_activity(snapshot, [], 200.0)
+    assert refreshed.fetched_at == 200.0
+    assert refreshed.full_fetched_at == 100.0
+
+
+def test_snapshots_without_a_full_fetch_time_count_as_too_old():
+    fields = {field: None for field in LeagueSnapshot._fields[:13]}
+    assert LeagueSnapshot(**fields).full_fetched_at == 0.0
+
+
+def test_concurrent_loads_of_one_league_run_the_loader_once():
+    cache = LeagueCache(max_bytes=1 << 20, ttl=3600)
+    started, release = threading.Event(), threading.Event()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        started.set()
+        release.wait(5)
+        return _snapshot(league_data.time.time(), 1)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch('key', loader))) for _ in range(8)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(loads) == 1 and len(results) == 8
+    assert not cache._key_locks
+
+
+def test_a_failed_load_releases_its_key_lock():
+    cache = LeagueCache(max_bytes=1 << 20, ttl=3600)
+
+    def loader():
+        raise RuntimeError('ESPN is down')
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_fetch('key', loader)
+    assert not cache._key_locks
+    assert cache.get_or_fetch('key', lambda: _snapshot(league_data.time.time(), 1)).current_week == 1
+
+
+def test_full_fetch_pages_every_position_at_once(monkeypatch):
+    # Each position's first request waits for all the others, which only works concurrently
+    arrived = threading.Barrier(len(league_data.FA_POSITIONS), timeout=5)
+    positions = []
+
+    class FakeRequests:
+        def league_get(self, params, headers):
+            slot = league_data.json.loads(headers["x-fantasy-filter"])["players"]["filterSlotIds"]["value"][0]
+            positions.append(slot)
+            arrived.wait()
+            return {"players": []}
+
+    class FakeLeague:
+        def __init__(self, league_id, year, swid, espn_s2):
+            self.year, self.current_week, self.espn_request = year, 1, FakeRequests()
+
+    monkeypatch.setattr(league_data, 'League', FakeLeague)
+    monkeypatch.setattr(league_data, 'snapshot_league', lambda league, free_agents: free_agents)
+    free_agents = league_data.fetch_league_snapshot(1, 2024, 'swid', 's2')
+    assert list(free_agents) == league_data.FA_POSITIONS
+    assert sorted(positions) == sorted(league_data.POSITION_MAP[pos] for pos in league_data.FA_POSITIONS)
+
+
+def test_week_scores_cache_finished_weeks_and_refetch_the_live_one(monkeypatch):
+    from league_data import WeekScores, league_week_scores
+    fetched = []
+
+    def fetch(league_id, year, swid, espn_s2, week):
+        fetched.append(week)
+        return WeekScores(week, week < 3, ((1, 2, 100.0, 90.0), (2, 1, 90.0, 100.0)))
+
+    monkeypatch.setattr(league_data, 'fetch_week_scores', fetch)
+    monkeypatch.setattr(league_data, '_week_score_cache', league_data.collections.OrderedDict())
+    snapshot = _snapshot(100.0, 3)
+    assert [week.week for week in league_week_scores(snapshot, 'swid', 's2')] == [1, 2, 3]
+    assert sorted(fetched) == [1, 2, 3]
+
+    fetched.clear()
+    league_week_scores(snapshot, 'swid', 's2')
+    assert fetched == []
+
+    league_week_scores(snapshot._replace(fetched_at=200.0), 'swid', 's2')
+    assert fetched == [3]
+
+
+def _espn_settings(reception_points):
+    from espn_api.football.settings import Settings
+    return Settings({'scheduleSettings': {'matchupPeriodCount': 14, 'matchupPeriods': {}, 'playoffTeamCount': 4, 'playoffSeedingRule': 'H2H_RECORD'},
+                     'tradeSettings': {'vetoVotesRequired': 4}, 'size': 10, 'draftSettings': {'keeperCount': 0}, 'name': 'League',
+                     'scoringSettings': {'matchupTieRule': 'NONE', 'playoffMatchupTieRule': 'NONE',
+                                         'scoringItems': [{'statId': 53, 'points': reception_points}, {'statId': 4, 'points': 4.0,
+                                                                                                       'pointsOverrides': {'16': 6.0}}]},
+                     'acquisitionSettings': {'isUsingAcquisitionBudget': False},
+                     'rosterSettings': {'lineupSlotCounts': {'0': 1}}})
+
+
+def test_scoring_points_stay_with_their_own_league():
+    half_ppr, full_ppr = _espn_settings(0.5), _espn_settings(1.0)
+    assert league_data._scoring_points(half_ppr) == {'REC': 0.5, 'PTD': 6.0}
+    assert league_data._scoring_points(full_ppr) == {'REC': 1.0, 'PTD': 6.0}
+
+
+# Two teams and a free agent: team 1 has players 10 and 11, team 2 has 20, and 30 is a free agent WR
+def _roster_snapshot():
+    from league_data import PlayerSnapshot, TeamSnapshot
+    players = {10: PlayerSnapshot(10, 'QB One', 'QB', 'KC'), 11: PlayerSnapshot(11, 'RB One', 'RB', 'SF'),
+               20: PlayerSnapshot(20, 'WR Two', 'WR', 'MIA'), 30: PlayerSnapshot(30, 'WR Free', 'WR', 'DAL')}
+    teams = (TeamSnapshot(1, 'One', (10, 11), (), 0, 0, 0, 0, (), ()), TeamSnapshot(2, 'Two', (20,), (), 0, 0, 0, 0, (), ()))
+    return _snapshot(100.0, 1)._replace(teams=teams, players=FrozenDict(players), free_agents=FrozenDict({'WR': (30,)}))
+
+
+def _topic(*messages):
+    return {'messages': [{'messageTypeId': msg_id, 'targetId': player_id, **teams} for msg_id, player_id, teams in messages]}
+
+
+@pytest.mark.parametrize('messages, rosters, free_agents', [
+    # Free agent and waiver adds
+    ([(178, 30, {'to': 2})], {1: (10, 11), 2: (20, 30)}, {'WR': ()}),
+    ([(180, 30, {'to': 1})], {1: (10, 11, 30), 2: (20,)}, {'WR': ()}),
+    # Drops go back to the free agent pool under the player's position
+    ([(179, 11, {'to': 1})], {1: (10,), 2: (20,)}, {'WR': (30,), 'RB': (11,)}),
+    ([(181, 20, {'to': 2})], {1: (10, 11), 2: ()}, {'WR': (30, 20)}),
+    # A 239 drop names the team under "for"
+    ([(239, 10, {'for': 1, 'to': 2})], {1: (11,), 2: (20,)}, {'WR': (30,), 'QB': (10,)}),
+    # Trades move the player between rosters without touching the pool
+    ([(244, 11, {'from': 1, 'to': 2})], {1: (10,), 2: (20, 11)}, {'WR': (30,)}),
+    # Drop then add replays in order
+    ([(179, 11, {'to': 1}), (178, 11, {'to': 2})], {1: (10,), 2: (20, 11)}, {'WR': (30,), 'RB': ()}),
+])
+def test_apply_activity_replays_roster_moves(messages, rosters, free_agents):
+    refreshed = league_data.apply_activity(_roster_snapshot(), [_topic(*messages)], 200.0)
+    assert {team.team_id: team.player_ids for team in refreshed.teams} == rosters
+    assert dict(refreshed.free_agents) == free_agents
+    assert refreshed.fetched_at == 200.0
+
+
+def test_apply_activity_replays_topics_oldest_first():
+    # Topics arrive newest first: the add to team 2 happened after the drop
+    topics = [_topic((178, 11, {'to': 2})), _topic((179, 11, {'to': 1}))]
+    refreshed = league_data.apply_activity(_roster_snapshot(), topics, 200.0)
+    assert {team.team_id: team.player_ids for team in refreshed.teams} == {1: (10,), 2: (20, 11)}
+
+
+@pytest.mark.parametrize('message', [
+    (178, 99, {'to': 1}),                # a player the snapshot has never seen
+    (178, 30, {'to': 7}),                # a team that isn't in the league
+    (239, 10, {'to': 1}),                # a 239 drop without its "for" team
+    (244, 11, {'from': 1, 'to': 7}),
+    (999, 10, {'to': 1}),                # a message type we don't know how to apply
+])
+def test_apply_activity_asks_for_a_full_fetch_when_a_move_does_not_fit(message):
+    assert league_data.apply_activity(_roster_snapshot(), [_topic(message)], 200.0) is None
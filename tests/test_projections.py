@@ -0,0 +1,17 @@
+import numpy as np
+import pandas as pd
+import projections
+
+
+def test_league_scoring_lines_players_up_by_player_key(monkeypatch):
+    stats = pd.DataFrame({'Player Name': ['AJ Brown', 'Travis Etienne'], 'Pos': ['WR', 'RB'],
+                          'REC': [90.0, 40.0], 'Games': [17.0, 17.0]})
+    ros = pd.DataFrame({'Player Name': ['A.J. Brown', 'Travis Etienne Jr.', 'Nobody'], 'Team': ['PHI', 'JAX', 'FA'],
+                        'Pos': ['WR', 'RB', 'WR'], 'PPR': [15.0, 12.0, 1.0]})
+    monkeypatch.setattr(projections, 'load_rankings', lambda mode: stats)
+    monkeypatch.setattr(projections, 'rankings_version', lambda mode: 'stats-test')
+
+    scored, _ = projections.cached_league_scoring(ros, {'REC': 1.0}, 'ros-test')
+    values = scored[projections.LEAGUE_SCORING].to_numpy()
+    assert np.allclose(values[:2], [90/17, 40/17])
+    assert np.isnan(values[2])
@@ -0,0 +1,64 @@
+import os
+import threading
+import pandas as pd
+import pytest
+import rankings
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    source = tmp_path / 'dynasty.csv'
+    pd.DataFrame({'Player': ['A', 'B'], 'Position': ['QB', 'RB'], 'SF': [10.0, 5.0]}).to_csv(source, index=False)
+    monkeypatch.setattr(rankings, 'SNAPSHOT_DIR', str(tmp_path / 'snapshots'))
+    monkeypatch.setitem(rankings.RANKINGS_SOURCES, 'dynasty', str(source))
+    monkeypatch.setattr(rankings, '_loaded_snapshots', {})
+    monkeypatch.setattr(rankings, '_retry_after', {})
+    return tmp_path
+
+
+def test_rebuilds_swap_the_snapshot_link(snapshot_dir):
+    rankings.build_snapshot('dynasty')
+    first = os.path.realpath(rankings._snapshot_path('dynasty'))
+    rankings.build_snapshot('dynasty')
+    assert os.path.islink(rankings._snapshot_path('dynasty'))
+    assert os.path.realpath(rankings._snapshot_path('dynasty')) != first
+    # The previous build stays for readers that already resolved it
+    assert os.path.exists(os.path.join(first, 'meta.json'))
+    assert list(rankings._open_snapshot('dynasty')[0]['Player Name']) == ['A', 'B']
+
+
+def test_failed_rebuild_backs_off(snapshot_dir, monkeypatch):
+    rankings.load_rankings('dynasty')
+    meta_path = os.path.join(rankings._snapshot_path('dynasty'), 'meta.json')
+    os.utime(meta_path, (0, 0))
+    attempts = []
+
+    def failing_build(mode):
+        attempts.append(mode)
+        raise OSError('source is down')
+
+    monkeypatch.setattr(rankings, 'build_snapshot', failing_build)
+    for _ in range(3):
+        assert list(rankings.load_rankings('dynasty')['Player Name']) == ['A', 'B']
+    assert attempts == ['dynasty']
+
+
+def test_waiting_for_another_process_rebuild_reuses_its_snapshot(snapshot_dir, monkeypatch):
+    fcntl = pytest.importorskip('fcntl')
+    builds = []
+    build = rankings.build_snapshot
+    monkeypatch.setattr(rankings, 'build_snapshot', lambda mode: builds.append(mode) or build(mode))
+
+    # A separately opened lockfile conflicts like another process holding it would
+    os.makedirs(rankings.SNAPSHOT_DIR)
+    with open(os.path.join(rankings.SNAPSHOT_DIR, '.dynasty.lock'), 'a') as other:
+        fcntl.flock(other, fcntl.LOCK_EX)
+        loader = threading.Thread(target=rankings.load_rankings, args=('dynasty',))
+        loader.start()
+        loader.join(.2)
+        assert loader.is_alive()
+        build('dynasty')
+        fcntl.flock(other, fcntl.LOCK_UN)
+    loader.join(5)
+    assert builds == []
+    assert list(rankings.load_rankings('dynasty')['Player Name']) == ['A', 'B']
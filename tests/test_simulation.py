@@ -0,0 +1,19 @@
+import numpy as np
+from simulation import lineup_points
+from valuation import RosterSlots
+
+SLOTS = RosterSlots(qb=1, rb=1, wr=1, te=0, flex=1, sflex=0, k=0, dst=0, bench=0)
+
+
+def test_lineup_points_start_the_best_eligible_players_every_week():
+    pos = np.array(["QB", "QB", "RB", "RB", "WR", "TE"], dtype=object)
+    scores = np.array([[20.0, 25.0, 10.0, 8.0, 12.0, 9.0],
+                       [20.0, 5.0, 10.0, 2.0, 12.0, 9.0]])
+    # QB, RB, WR and the best of what's left at RB/WR/TE in the flex
+    assert np.allclose(lineup_points(pos, scores, SLOTS), [25 + 10 + 12 + 9, 20 + 10 + 12 + 9])
+
+
+def test_lineup_points_leave_short_slots_empty():
+    pos = np.array(["QB", "TE"], dtype=object)
+    scores = np.array([[20.0, 9.0]])
+    assert np.allclose(lineup_points(pos, scores, SLOTS), [29.0])
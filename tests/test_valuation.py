@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+import pytest
+from valuation import (PICK_POSITION, POSITIONS, SLOT_TYPES, RosterSlots, _greedy_starters, _sorted_rows, counted_bench,
+                       grade_roster, greedy_is_optimal, lineup_rows, parse_pick, position_weights, slot_counts,
+                       split_lineup, team_draft_picks)
+
+STANDARD = RosterSlots(qb=1, rb=2, wr=2, te=1, flex=1, sflex=0, k=1, dst=1, bench=6)
+
+
+# A full 16 player roster: 3 QB, 5 RB, 5 WR, 1 TE, 1 K, 1 D/ST
+def _roster():
+    pos = ["QB"]*3 + ["RB"]*5 + ["WR"]*5 + ["TE", "K", "D/ST"]
+    return pd.DataFrame({'Player Name': [f"P{n}" for n in range(1, 17)], 'Pos': pos,
+                         'Value': np.linspace(100, 25, len(pos))})
+
+
+def test_split_lineup_benches_every_ranked_player_that_does_not_start():
+    roster = _roster()
+    starters, _, bench = split_lineup(roster['Pos'].to_numpy(dtype=object), roster['Value'].to_numpy(), STANDARD)
+    assert len(starters) == 8
+    assert sorted([*starters, *bench]) == list(range(16))
+
+
+def test_lineup_rows_lists_the_whole_roster_past_the_bench_cap():
+    roster = _roster()
+    grade = grade_roster(roster, 'Value', STANDARD)
+    assert sorted(roster['Player Name'].take(lineup_rows(grade))) == sorted(roster['Player Name'])
+
+
+def test_bench_cap_only_limits_what_counts_towards_the_grade():
+    roster = _roster()
+    grade = grade_roster(roster, 'Value', STANDARD)
+    counted = grade.bench_weighted != 0
+    # The kicker fills the K slot, and the best six of the rest fill the bench
+    assert counted.sum() == 7
+    assert 'K' in set(roster['Pos'].take(grade.bench_rows[counted]))
+    # The one left out is the non-kicker worth least to the grade, the third QB
+    left_out = grade.bench_rows[~counted]
+    assert list(roster['Player Name'].take(left_out)) == ['P3']
+
+
+def test_counted_bench_keeps_every_player_without_a_bench_limit():
+    pos = np.array(["RB"]*10, dtype=object)
+    points = np.arange(10, dtype=np.float64)
+    rows = np.arange(10)
+    assert counted_bench(pos, points, rows, STANDARD._replace(bench=0), position_weights(STANDARD)).all()
+    assert counted_bench(pos, points, rows, STANDARD, position_weights(STANDARD)).sum() == 6
+
+
+# Best starting total by trying every player (or nobody) in every slot
+def _best_by_brute_force(pos, points, slots):
+    counts = slot_counts(slots)
+    unit_slots = [eligible for name, eligible in SLOT_TYPES for _ in range(counts[name])]
+
+    def best(slot, used):
+        if slot == len(unit_slots):
+            return 0.0
+        options = [best(slot + 1, used)]
+        for row in range(len(pos)):
+            if row not in used and pos[row] in unit_slots[slot]:
+                options.append(points[row] + best(slot + 1, used | {row}))
+        return max(options)
+
+    return best(0, frozenset())
+
+
+def test_split_lineup_matches_brute_force_on_random_rosters():
+    rng = np.random.default_rng(7)
+    eligible = dict(SLOT_TYPES)
+    for _ in range(200):
+        pos = rng.choice(["QB", "RB", "WR", "TE"], size=rng.integers(1, 9)).astype(object)
+        points = rng.integers(0, 30, size=len(pos)).astype(np.float64)
+        slots = RosterSlots(*rng.integers(0, 2, size=6), k=0, dst=0, bench=0,
+                            rb_wr=rng.integers(0, 2), wr_te=rng.integers(0, 2))
+        starters, starter_slots, _ = split_lineup(pos, points, slots)
+        assert len(set(starters)) == len(starters)
+        assert all(p in eligible[slot] for p, slot in zip(pos[starters], starter_slots))
+        assert points[starters].sum() == _best_by_brute_force(pos, points, slots)
+
+
+def test_split_lineup_solves_lineups_greedy_gets_wrong():
+    pos = np.array(["WR", "RB", "TE"], dtype=object)
+    points = np.array([10.0, 9.0, 1.0])
+    slots = RosterSlots(qb=0, rb=0, wr=0, te=0, flex=0, sflex=0, k=0, dst=0, bench=0, rb_wr=1, wr_te=1)
+    # Greedy spends the WR on RB/WR and is left with the TE for WR/TE
+    by_pos = {p: _sorted_rows(np.flatnonzero(pos == p), points) for p in POSITIONS}
+    greedy_rows, _ = _greedy_starters(by_pos, points, slot_counts(slots))
+    assert not greedy_is_optimal(slots)
+    assert points[greedy_rows].sum() == 11.0
+
+    starters, starter_slots, bench = split_lineup(pos, points, slots)
+    assert points[starters].sum() == 19.0
+    assert dict(zip(pos[starters], starter_slots)) == {"RB": "RB/WR", "WR": "WR/TE"}
+    assert list(bench) == [2]
+
+
+def test_vorp_rankings_measure_picks_against_a_replacement_level_too():
+    from valuation import FreeAgentPool, cached_vorp_rankings
+    ros = pd.DataFrame({'Player Name': ['QB1', 'QB2', 'RB1', 'RB2', '2025 1.01'], 'Team': 'X',
+                        'Pos': ['QB', 'QB', 'RB', 'RB', 'Draft'], 'Value': [30.0, 20.0, 25.0, 15.0, 22.0]})
+    fa_pool = FreeAgentPool(ros.iloc[:0], {})
+    slots = RosterSlots(qb=1, rb=1, wr=0, te=0, flex=0, sflex=0, k=0, dst=0, bench=0)
+    vorp, levels, _ = cached_vorp_rankings(ros, 'Value', fa_pool, 1, slots, 'test', 'test')
+    assert levels == {'QB': 20.0, 'RB': 15.0, 'WR': 0.0, 'TE': 0.0, 'K': 0.0, 'D/ST': 0.0}
+    assert vorp.loc[vorp['Pos'] == 'Draft', 'Value'].item() == 22.0 - (20.0 + 15.0)/2
+
+
+def test_actual_points_rankings_count_all_play_across_every_week():
+    from league_data import WeekScores
+    from valuation import actual_points_rankings
+    weeks = [WeekScores(1, True, ((1, 2, 100.0, 90.0), (2, 1, 90.0, 100.0), (3, 4, 80.0, 70.0), (4, 3, 70.0, 80.0))),
+             WeekScores(2, True, ((1, 3, 60.0, 110.0), (3, 1, 110.0, 60.0), (2, 4, 95.0, 85.0), (4, 2, 85.0, 95.0))),
+             WeekScores(3, False, ((1, 4, 12.0, 3.0), (4, 1, 3.0, 12.0)))]
+    rankings, rolling = actual_points_rankings((1, 2, 3, 4), ('A', 'B', 'C', 'D'), weeks, trend_weeks=2)
+    # B and C both go 4-2 in all-play, and C has scored more
+    by_team = rankings.set_index('Team')
+    assert list(rankings['Team']) == ['C', 'B', 'A', 'D']
+    assert by_team.loc['B', 'All-Play'] == '4-2' and by_team.loc['B', 'Record'] == '1-1'
+    assert by_team.loc['A', 'PF'] == 160.0 and by_team.loc['A', 'PA'] == 200.0
+    assert by_team.loc['A', 'Week 3 (Live)'] == 12.0
+    assert list(rolling.index) == [1, 2] and rolling.loc[2, 'C'] == 95.0
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("2025 1.03", (2025, 1, 2/11)),
+    ("2025 Round 2 Pick 12", (2025, 2, 1.0)),
+    ("2025 Early 1st", (2025, 1, 1/6)),
+    ("2026 Mid 2nd", (2026, 2, 1/2)),
+    ("2026 2nd", (2026, 2, None)),
+    ("2027 Round 3", (2027, 3, None)),
+    ("Justin Jefferson", None),
+    ("2025", None),
+])
+def test_parse_pick_reads_round_overall_and_future_picks(name, expected):
+    assert parse_pick(name, 12) == expected
+
+
+def _pick_values():
+    return pd.DataFrame({'Player Name': ['2025 1.01', '2025 1.04', '2025 2.01', '2025 2.04', '2026 1st', '2026 2nd', '2024 1.01'],
+                         'Pos': PICK_POSITION, 'Value': [40.0, 25.0, 16.0, 10.0, 30.0, 12.0, 99.0]})
+
+
+def test_team_draft_picks_values_next_years_picks_by_projected_slot():
+    picks = team_draft_picks(['Worst', 'B', 'C', 'Best'], _pick_values(), 'Value', 2024)
+    assert set(picks) == {'Worst', 'B', 'C', 'Best'}
+    worst = picks['Worst'].set_index('Player Name')['Value']
+    assert worst.to_dict() == {'2025 1.01 (Worst)': 40.0, '2025 2.01 (Worst)': 16.0,
+                               '2026 Round 1 (Worst)': 30.0, '2026 Round 2 (Worst)': 12.0}
+    assert picks['Best'].set_index('Player Name').loc['2025 1.04 (Best)', 'Value'] == 25.0
+    # Future years sit mid-round, so every team's are worth the same
+    assert picks['B'].iloc[-2:]['Value'].tolist() == picks['Best'].iloc[-2:]['Value'].tolist() == [30.0, 12.0]
+
+
+def test_traded_picks_keep_their_original_teams_value():
+    picks = team_draft_picks(['Worst', 'B', 'C', 'Best'], _pick_values(), 'Value', 2024)
+    names = [name for frame in picks.values() for name in frame['Player Name']]
+    assert len(names) == len(set(names))
+    # The best team trading for the worst team's first takes that slot's value with it
+    traded = picks['Worst'][picks['Worst']['Player Name'] == '2025 1.01 (Worst)']
+    best_after = pd.concat([picks['Best'], traded], ignore_index=True)
+    worst_after = picks['Worst'].drop(traded.index)
+    assert best_after['Value'].sum() - picks['Best']['Value'].sum() == 40.0
+    assert picks['Worst']['Value'].sum() - worst_after['Value'].sum() == 40.0
@@ -0,0 +1,679 @@
+import os
+import re
+import threading
+import collections
+import numpy as np
+import pandas as pd
+
+POSITIONS = ["QB", "RB", "WR", "TE", "K", "D/ST"]
+FLEX_POSITIONS = ["RB", "WR", "TE"]
+
+# Position draft picks are listed under in the dynasty rankings
+PICK_POSITION = "Draft"
+
+# Starting slot counts from the Input Settings tab. RB/WR and WR/TE are ESPN's narrower
+# flex spots and default to none.
+RosterSlots = collections.namedtuple('RosterSlots', ['qb', 'rb', 'wr', 'te', 'flex', 'sflex', 'k', 'dst', 'bench', 'rb_wr', 'wr_te'],
+                                     defaults=(0, 0))
+
+# Starting slot types and the positions each can take, in the order lineups list them.
+# Kickers aren't started in grades (they're valued through the bench weights like they
+# always have been) and SuperFlex takes QBs only.
+SLOT_TYPES = [("QB", ("QB",)), ("RB", ("RB",)), ("WR", ("WR",)), ("TE", ("TE",)), ("D/ST", ("D/ST",)),
+              ("RB/WR", ("RB", "WR")), ("WR/TE", ("WR", "TE")), ("FLEX", tuple(FLEX_POSITIONS)), ("SuperFlex", ("QB",))]
+
+# Result of grading one roster. starter_rows and bench_rows are positions into the
+# values frame that was graded, so callers can take() rows instead of copying slices.
+RosterGrade = collections.namedtuple('RosterGrade', ['score', 'positions', 'starter_rows', 'starter_slots', 'bench_rows', 'bench_weighted'])
+
+# Ranked free agents, best first, with the row positions of each position's players
+FreeAgentPool = collections.namedtuple('FreeAgentPool', ['values', 'by_position'])
+
+
+####################################
+##### Match Roster to Rankings #####
+####################################
+
+# Match each player name on a roster to the rankings and return one row per roster spot
+# with the rankings columns. Unmatched players keep a row with missing values.
+def match_roster(player_names, ros, find_best_match, columns=None, threshold=90):
+    choices = ros['Player Name']
+    best_matches = [find_best_match(name, choices) for name in player_names]
+    matched = pd.DataFrame({'Matched': [m[0] if m is not None and m[1] >= threshold else None for m in best_matches]})
+
+    # Merge matched players based on the best match
+    values = matched.merge(ros, left_on='Matched', right_on='Player Name', how='left')
+    if columns is not None:
+        values = values[columns]
+    return values
+
+
+##################################
+##### Starters & Bench Split #####
+##################################
+
+# Sort row positions by value, best first, with missing values last
+def _sorted_rows(rows, points):
+    key = points[rows]
+    key = np.where(np.isnan(key), -np.inf, key)
+    return rows[np.argsort(-key, kind='stable')]
+
+
+def slot_counts(slots):
+    return {"QB": slots.qb, "RB": slots.rb, "WR": slots.wr, "TE": slots.te, "D/ST": slots.dst,
+            "RB/WR": slots.rb_wr, "WR/TE": slots.wr_te, "FLEX": slots.flex, "SuperFlex": slots.sflex}
+
+
+# Filling each slot type in SLOT_TYPES order with the best players left is optimal when
+# any two slot types in use either share no positions or one takes all of the other's.
+# RB/WR and WR/TE together break that, and so need the exact solver.
+def greedy_is_optimal(slots):
+    counts = slot_counts(slots)
+    used = [set(eligible) for name, eligible in SLOT_TYPES if counts[name]]
+    return all(a <= b or b <= a or not a & b for a in used for b in used)
+
+
+# Greedy fill: dedicated spots from the top of each position, then each flex spot from
+# the best players left at the positions it takes
+def _greedy_starters(by_pos, points, counts):
+    taken = dict.fromkeys(POSITIONS, 0)
+    starter_rows = []
+    starter_slots = []
+    for name, eligible in SLOT_TYPES:
+        viable = np.concatenate([by_pos[p][taken[p]:] for p in eligible])
+        rows = _sorted_rows(viable, points)[:counts[name]]
+        for p in eligible:
+            taken[p] += np.isin(rows, by_pos[p]).sum()
+        starter_rows.append(rows)
+        starter_slots.append(np.full(len(rows), name, dtype=object))
+    return np.concatenate(starter_rows).astype(np.intp), np.concatenate(starter_slots)
+
+
+# Exact fill. Whichever slots they end up in, a position's starters are always its best
+# players, so the lineup comes down to how many start at each position. Every mix is
+# scored at once and checked against Hall's condition (any group of positions has to fit
+# in the slots that can take one of them); the best one that fits is then placed into
+# slots with a small bipartite matching.
+def _exact_starters(by_pos, points, counts):
+    types = [(name, eligible) for name, eligible in SLOT_TYPES if counts[name]]
+    positions = [p for p in POSITIONS if any(p in eligible for _, eligible in types)]
+    caps = [min(len(by_pos[p]), sum(counts[name] for name, eligible in types if p in eligible)) for p in positions]
+    prefix = [np.concatenate([[0], np.cumsum(np.nan_to_num(points[by_pos[p][:cap]]))]) for p, cap in zip(positions, caps)]
+
+    mixes = np.stack(np.meshgrid(*[np.arange(cap + 1) for cap in caps], indexing='ij'), axis=-1).reshape(-1, len(positions))
+    totals = sum(prefix[i][mixes[:, i]] for i in range(len(positions)))
+    fits = np.ones(len(mixes), dtype=bool)
+    for group in range(1, 2**len(positions)):
+        members = [i for i in range(len(positions)) if group >> i & 1]
+        capacity = sum(counts[name] for name, eligible in types if any(positions[i] in eligible for i in members))
+        fits &= mixes[:, members].sum(axis=1) <= capacity
+    candidates = np.flatnonzero(fits)
+    # Highest total, and on ties the mix that starts the most players
+    best = mixes[candidates[np.lexsort((mixes[candidates].sum(axis=1), totals[candidates]))[-1]]]
+
+    chosen = [(row, p) for p, n in zip(positions, best) for row in by_pos[p][:n]]
+    unit_slots = [(name, eligible) for name, eligible in types for _ in range(counts[name])]
+    slot_player = {}
+
+    def place(i, seen):
+        for s, (_, eligible) in enumerate(unit_slots):
+            if chosen[i][1] in eligible and s not in seen:
+                seen.add(s)
+                if s not in slot_player or place(slot_player[s], seen):
+                    slot_player[s] = i
+                    return True
+        return False
+
+    for i in range(len(chosen)):
+        place(i, set())
+    filled = sorted(slot_player)
+    return (np.array([chosen[slot_player[s]][0] for s in filled], dtype=np.intp),
+            np.array([unit_slots[s][0] for s in filled], dtype=object))
+
+
+# Split a roster into starters and bench using plain index arrays. The bench is every
+# ranked player that isn't starting, however many bench spots the league has.
+def split_lineup(pos, points, slots):
+    by_pos = {p: _sorted_rows(np.flatnonzero(pos == p), points) for p in POSITIONS}
+    counts = slot_counts(slots)
+    if greedy_is_optimal(slots):
+        starter_rows, starter_slots = _greedy_starters(by_pos, points, counts)
+    else:
+        starter_rows, starter_slots = _exact_starters(by_pos, points, counts)
+
+    # Create Bench: every ranked player that isn't starting
+    is_bench = np.zeros(len(pos), dtype=bool)
+    for p in POSITIONS:
+        is_bench |= pos == p
+    is_bench[starter_rows] = False
+    return starter_rows, starter_slots, np.flatnonzero(is_bench)
+
+
+# Which bench players count towards a grade: only as many as the league has bench
+# spots, the ones worth most to the grade. Grades don't start kickers, so the best
+# kickers fill the K slots rather than bench spots. Zero bench spots means no limit.
+def counted_bench(pos, points, bench_rows, slots, weights):
+    counted = np.ones(len(bench_rows), dtype=bool)
+    if not slots.bench:
+        return counted
+    bench_pos = pos[bench_rows]
+    kickers = np.flatnonzero(bench_pos == "K")
+    in_k_slots = kickers[_sorted_rows(np.arange(len(kickers)), points[bench_rows[kickers]])[:slots.k]]
+    others = np.setdiff1d(np.arange(len(bench_rows)), in_k_slots)
+    if len(others) > slots.bench:
+        worth = np.nan_to_num(points[bench_rows[others]])*np.array([weights[p] for p in bench_pos[others]])
+        counted[others[np.argsort(-worth, kind='stable')[slots.bench:]]] = False
+    return counted
+
+
+############################
+##### Calculate Grades #####
+############################
+
+# Share of the starting lineup each position can fill
+def position_weights(slots):
+    total = slots.qb + slots.rb + slots.wr + slots.te + slots.flex + slots.sflex + slots.k + slots.dst + slots.rb_wr + slots.wr_te
+    if total == 0:
+        return dict.fromkeys(POSITIONS, 0)
+    return {"QB": (slots.qb + slots.sflex)/total,
+            "RB": (slots.rb + slots.rb_wr + slots.flex + slots.sflex)/total,
+            "WR": (slots.wr + slots.rb_wr + slots.wr_te + slots.flex + slots.sflex)/total,
+            "TE": (slots.te + slots.wr_te + slots.flex + slots.sflex)/total,
+            "K": slots.k/total,
+            "D/ST": slots.dst/total}
+
+
+# What one point of draft pick value adds to a grade. A pick turns into a player at
+# some position, so it counts like a lone bench player at the average position weight.
+def pick_weight(slots, bench_multiplier=1):
+    return np.mean(list(position_weights(slots).values()))*bench_multiplier
+
+
+# Grade a roster: starters count in full, and each position's bench shares that
+# position's lineup weight, boosted by bench_multiplier (5 for dynasty). Bench players
+# past the league's bench spots are listed with a weight of zero. Any draft picks
+# on the roster add their value at pick_weight. weights replaces the lineup weights,
+# for trying other bench weightings.
+def grade_roster(values, scoring, slots, bench_multiplier=1, weights=None):
+    pos = values['Pos'].to_numpy(dtype=object)
+    points = values[scoring].to_numpy(dtype=np.float64)
+    starter_rows, starter_slots, bench_rows = split_lineup(pos, points, slots)
+
+    weights = position_weights(slots) if weights is None else weights
+    bench_pos = pos[bench_rows]
+    counted = counted_bench(pos, points, bench_rows, slots, weights)
+    bench_weighted = np.zeros(len(bench_rows))
+    positions = {}
+    for p in POSITIONS:
+        on_bench = (bench_pos == p) & counted
+        n_on_bench = on_bench.sum()
+        if n_on_bench:
+            bench_weighted[on_bench] = points[bench_rows[on_bench]]*(weights[p]/n_on_bench)*bench_multiplier
+        positions[p] = np.nansum(points[starter_rows[pos[starter_rows] == p]]) + np.nansum(bench_weighted[on_bench])
+
+    score = np.nansum(points[starter_rows]) + np.nansum(bench_weighted)
+    score += np.nansum(points[pos == PICK_POSITION])*pick_weight(slots, bench_multiplier)
+    return RosterGrade(score, positions, starter_rows, starter_slots, bench_rows, bench_weighted)
+
+
+# Starters followed by bench, the order the trade calculator lists a roster in
+def lineup_rows(grade):
+    return np.concatenate([grade.starter_rows, grade.bench_rows])
+
+
+#########################
+##### Cached Grades #####
+#########################
+
+GRADE_CACHE_SIZE = 2048
+_grade_cache = collections.OrderedDict()
+_grade_cache_lock = threading.Lock()
+
+
+# Match and grade a roster, reusing the result while the roster, rankings and settings
+# are unchanged. After a delta refresh only the teams whose rosters moved are regraded.
+# The returned values frame is shared, so callers must not modify it.
+def cached_team_grade(player_names, ros, find_best_match, scoring, slots, bench_multiplier, rankings_version):
+    key = (rankings_version, scoring, tuple(slots), bench_multiplier, tuple(player_names))
+    with _grade_cache_lock:
+        if key in _grade_cache:
+            _grade_cache.move_to_end(key)
+            return _grade_cache[key]
+
+    values = match_roster(player_names, ros, find_best_match, columns=["Player Name", "Team", "Pos", scoring])
+    result = (values, grade_roster(values, scoring, slots, bench_multiplier))
+
+    with _grade_cache_lock:
+        _grade_cache[key] = result
+        while len(_grade_cache) > GRADE_CACHE_SIZE:
+            _grade_cache.popitem(last=False)
+    return result
+
+
+# Grade every team in a league, best first, in the Power Rankings layout
+def league_power_rankings(rosters, ros, find_best_match, scoring, slots, bench_multiplier, rankings_version):
+    rows = []
+    for team, player_names in rosters.items():
+        _, grade = cached_team_grade(player_names, ros, find_best_match, scoring, slots, bench_multiplier, rankings_version)
+        rows.append({'Team': team, 'Team Grade': round(grade.score,1), **{p: round(grade.positions[p],1) for p in POSITIONS}})
+    grades = pd.DataFrame(rows, columns=['Team', 'Team Grade', *POSITIONS])
+    return grades.sort_values(by='Team Grade', ascending=False).reset_index(drop=True)
+
+
+##################################
+##### Actual Points Rankings #####
+##################################
+
+# Recent weeks the trend columns average over
+TREND_WEEKS = int(os.environ.get('ACTUAL_RANKINGS_TREND_WEEKS', 3))
+
+
+# Teams × weeks grids of points for and against from league_data.WeekScores, NaN where
+# a team didn't play
+def points_grid(team_ids, week_scores):
+    rows = {team_id: n for n, team_id in enumerate(team_ids)}
+    games = np.array([(w, rows[team_id], points, np.nan if opponent_points is None else opponent_points)
+                      for w, week in enumerate(week_scores) for team_id, _, points, opponent_points in week.games
+                      if team_id in rows], dtype=np.float64).reshape(-1, 4)
+    points_for = np.full((len(team_ids), len(week_scores)), np.nan)
+    points_against = np.full((len(team_ids), len(week_scores)), np.nan)
+    cols, team_rows = games[:, 0].astype(int), games[:, 1].astype(int)
+    points_for[team_rows, cols] = games[:, 2]
+    points_against[team_rows, cols] = games[:, 3]
+    return points_for, points_against
+
+
+# Power rankings from the points teams have actually scored in finished weeks, best
+# first. All-play counts every team against every other team each week; Luck is actual
+# wins over what the all-play rate would give for the games played. The trend columns
+# compare the last trend_weeks with the season average, and the week in progress is
+# shown live without counting towards anything. Also returns each team's points per
+# week averaged over trend_weeks, for charting.
+def actual_points_rankings(team_ids, team_names, week_scores, trend_weeks=TREND_WEEKS):
+    finished = [week for week in week_scores if week.final]
+    live = next((week for week in reversed(week_scores) if not week.final), None)
+    points_for, points_against = points_grid(team_ids, finished)
+    played = ~np.isnan(points_for)
+
+    # Every pair of teams in every week at once: teams × teams × weeks
+    diff = points_for[:, None, :] - points_for[None, :, :]
+    pairs = played[:, None, :] & played[None, :, :] & ~np.eye(len(team_ids), dtype=bool)[:, :, None]
+    all_play_wins = ((diff > 0) & pairs).sum(axis=(1, 2))
+    all_play_losses = ((diff < 0) & pairs).sum(axis=(1, 2))
+    all_play_ties = ((diff == 0) & pairs).sum(axis=(1, 2))
+    all_play_games = all_play_wins + all_play_losses + all_play_ties
+    all_play_rate = np.divide(all_play_wins + all_play_ties/2, all_play_games, out=np.zeros(len(team_ids)), where=all_play_games > 0)
+
+    head_to_head = played & ~np.isnan(points_against)
+    wins = ((points_for > points_against) & head_to_head).sum(axis=1)
+    losses = ((points_for < points_against) & head_to_head).sum(axis=1)
+    ties = ((points_for == points_against) & head_to_head).sum(axis=1)
+
+    games_played = played.sum(axis=1)
+    season_for = np.divide(np.nansum(points_for, axis=1), games_played, out=np.zeros(len(team_ids)), where=games_played > 0)
+    season_against = np.divide(np.nansum(points_against, axis=1), head_to_head.sum(axis=1),
+                               out=np.zeros(len(team_ids)), where=head_to_head.any(axis=1))
+    weeks = [week.week for week in finished]
+    rolling_for = pd.DataFrame(points_for.T, index=pd.Index(weeks, name='Week'), columns=list(team_names)).rolling(trend_weeks, min_periods=1).mean()
+    recent_for = pd.DataFrame(points_for.T).tail(trend_weeks).mean().to_numpy()
+    recent_against = pd.DataFrame(points_against.T).tail(trend_weeks).mean().to_numpy()
+
+    rankings = pd.DataFrame({'Team': list(team_names),
+                             'All-Play': [f"{w}-{l}" + (f"-{t}" if t else "") for w, l, t in zip(all_play_wins, all_play_losses, all_play_ties)],
+                             'All-Play %': (100*all_play_rate).round(1),
+                             'Record': [f"{w}-{l}" + (f"-{t}" if t else "") for w, l, t in zip(wins, losses, ties)],
+                             'Luck': (wins + ties/2 - all_play_rate*head_to_head.sum(axis=1)).round(1),
+                             'PF': np.nansum(points_for, axis=1).round(1),
+                             'PA': np.nansum(points_against, axis=1).round(1),
+                             'PF/Week': season_for.round(1),
+                             f'PF Last {trend_weeks}': recent_for.round(1),
+                             f'PA Last {trend_weeks}': recent_against.round(1),
+                             'PF Trend': (recent_for - season_for).round(1)})
+    if live is not None:
+        live_for, _ = points_grid(team_ids, [live])
+        rankings[f'Week {live.week} (Live)'] = live_for[:, 0].round(1)
+    rankings = rankings.sort_values(by=['All-Play %', 'PF'], ascending=False).reset_index(drop=True)
+    return rankings, rolling_for.round(1)
+
+
+#############################
+##### Free Agent Values #####
+#############################
+
+FREE_AGENT_CACHE_SIZE = 64
+_free_agent_cache = collections.OrderedDict()
+_free_agent_cache_lock = threading.Lock()
+
+
+# Match and value a league's free agents once per snapshot, rankings and scoring column.
+# Players that don't match the rankings are left out, and so are repeat matches to
+# the same ranked player.
+def cached_free_agent_pool(player_names, ros, find_best_match, scoring, rankings_version, snapshot_version):
+    key = (snapshot_version, rankings_version, scoring)
+    with _free_agent_cache_lock:
+        if key in _free_agent_cache:
+            _free_agent_cache.move_to_end(key)
+            return _free_agent_cache[key]
+
+    values = match_roster(player_names, ros, find_best_match, columns=["Player Name", "Team", "Pos", scoring])
+    values = values.dropna(subset=['Player Name']).drop_duplicates(subset='Player Name')
+    values = values.sort_values(by=scoring, ascending=False, kind='stable').reset_index(drop=True)
+    pos = values['Pos'].to_numpy(dtype=object)
+    pool = FreeAgentPool(values, {p: np.flatnonzero(pos == p) for p in POSITIONS})
+
+    with _free_agent_cache_lock:
+        _free_agent_cache[key] = pool
+        while len(_free_agent_cache) > FREE_AGENT_CACHE_SIZE:
+            _free_agent_cache.popitem(last=False)
+    return pool
+
+
+# Free agents at the given positions, best first
+def free_agents_at(pool, positions):
+    rows = [pool.by_position[p] for p in positions if p in pool.by_position]
+    if not rows:
+        return pool.values.iloc[:0]
+    # Rows are already in value order, so merging positions is just a sort of row numbers
+    return pool.values.take(np.sort(np.concatenate(rows)))
+
+
+##########################
+##### Weekly Lineups #####
+##########################
+
+# Best starting lineup for many rosters and weeks (or simulated weeks) at once. pos
+# broadcasts against points along the last (players) axis; padding and players on bye
+# score zero. Fills SLOT_TYPES greedily, which is exact unless RB/WR and WR/TE are both
+# in use, and starts kickers since these are weekly lineups rather than grades.
+# Returns lineup points and the number of starting slots left empty.
+def weekly_lineup_points(pos, points, slots):
+    counts = {**slot_counts(slots), "K": slots.k}
+    pool = np.where(np.isnan(points), -np.inf, points)
+    is_pos = {p: pos == p for p in POSITIONS}
+    total = np.zeros(points.shape[:-1])
+    empty = np.zeros(points.shape[:-1], dtype=np.intp)
+    for name, eligible in [*SLOT_TYPES, ("K", ("K",))]:
+        n = counts[name]
+        if n == 0:
+            continue
+        eligible_players = np.logical_or.reduce([is_pos[p] for p in eligible])
+        viable = np.where(eligible_players, pool, -np.inf)
+        picked = np.argsort(-viable, axis=-1, kind='stable')[..., :n]
+        starters = np.take_along_axis(viable, picked, axis=-1)
+        total += np.where(starters > 0, starters, 0).sum(axis=-1)
+        empty += n - (starters > 0).sum(axis=-1)
+        # Starters can't fill another slot; ineligible picks of a short slot stay available
+        np.put_along_axis(pool, picked, np.where(np.isfinite(starters), -np.inf, np.take_along_axis(pool, picked, axis=-1)), axis=-1)
+    return total, empty
+
+
+# Rest-of-season lineups for every team in one pass over a teams x weeks x players
+# tensor. team_values maps team names to values frames and player_byes maps ranked
+# player names to their bye weeks. Returns per-week lineup points and empty starting
+# slots, each a frame with one row per team and one column per week.
+def rest_of_season_lineups(team_values, scoring, slots, weeks, player_byes):
+    teams = list(team_values)
+    n_players = max((len(values) for values in team_values.values()), default=0)
+    pos = np.full((len(teams), 1, n_players), '', dtype=object)
+    points = np.zeros((len(teams), len(weeks), n_players))
+    weeks_index = np.asarray(weeks)
+
+    for t, team in enumerate(teams):
+        values = team_values[team]
+        n = len(values)
+        pos[t, 0, :n] = values['Pos'].to_numpy(dtype=object)
+        value = np.nan_to_num(values[scoring].to_numpy(dtype=np.float64))
+        playing = np.array([~np.isin(weeks_index, player_byes.get(name, ())) for name in values['Player Name']]).reshape(n, len(weeks))
+        points[t, :, :n] = (value[:, None]*playing).T
+
+    lineup_points, empty_slots = weekly_lineup_points(pos, points, slots)
+    return (pd.DataFrame(lineup_points, index=teams, columns=weeks),
+            pd.DataFrame(empty_slots, index=teams, columns=weeks))
+
+
+#############################
+##### Replacement Level #####
+#############################
+
+# Starting spots the whole league fills at each position. Shared spots (FLEX, RB/WR,
+# WR/TE) are split by each eligible position's share of the dedicated spots; SuperFlex
+# goes to QBs, like it does in the lineup split.
+def starter_demand(team_count, slots):
+    counts = {"QB": slots.qb + slots.sflex, "RB": slots.rb, "WR": slots.wr, "TE": slots.te, "K": slots.k, "D/ST": slots.dst}
+    dedicated = dict(counts)
+    for n, eligible in [(slots.flex, FLEX_POSITIONS), (slots.rb_wr, ("RB", "WR")), (slots.wr_te, ("WR", "TE"))]:
+        base = sum(dedicated[p] for p in eligible)
+        for p in eligible:
+            counts[p] += n*(dedicated[p]/base if base else 1/len(eligible))
+    return {p: team_count*n for p, n in counts.items()}
+
+
+# Replacement value at each position: the best player left once every team has filled
+# its starting spots, and never less than the best free agent, who can be had for nothing
+def replacement_levels(ros, scoring, fa_pool, team_count, slots):
+    demand = starter_demand(team_count, slots)
+    pos = ros['Pos'].to_numpy(dtype=object)
+    points = np.nan_to_num(ros[scoring].to_numpy(dtype=np.float64))
+    levels = {}
+    for p in POSITIONS:
+        ranked = np.sort(points[pos == p])[::-1]
+        n = int(np.ceil(demand[p]))
+        level = ranked[n] if n < len(ranked) else 0.0
+        best_fa = fa_pool.by_position.get(p, ())
+        if len(best_fa):
+            level = max(level, np.nan_to_num(fa_pool.values[scoring].iat[best_fa[0]]))
+        levels[p] = float(level)
+    return levels
+
+
+# Replacement level for draft picks. A pick turns into a player at some position, so
+# its baseline is every position's level weighted by that position's share of the lineup.
+def pick_replacement_level(levels, slots):
+    weights = position_weights(slots)
+    total = sum(weights[p] for p in levels)
+    return sum(levels[p]*weights[p] for p in levels)/total if total else 0.0
+
+
+# Rankings with the scoring column re-expressed as value over replacement, floored at
+# zero. Positions without a replacement level keep their value.
+def vorp_rankings(ros, scoring, levels):
+    vorp = ros[["Player Name", "Team", "Pos", scoring]].copy()
+    replacement = vorp['Pos'].map(levels).to_numpy(dtype=np.float64)
+    points = vorp[scoring].to_numpy(dtype=np.float64)
+    vorp[scoring] = np.where(np.isnan(replacement), points, np.maximum(points - np.nan_to_num(replacement), 0))
+    return vorp
+
+
+VORP_CACHE_SIZE = 16
+_vorp_cache = collections.OrderedDict()
+_vorp_cache_lock = threading.Lock()
+
+
+# Value-over-replacement rankings for a league, plus the replacement levels and a
+# version string to grade against them with. Cached per snapshot, rankings and settings.
+def cached_vorp_rankings(ros, scoring, fa_pool, team_count, slots, rankings_version, snapshot_version):
+    key = (snapshot_version, rankings_version, scoring, team_count, tuple(slots))
+    with _vorp_cache_lock:
+        if key in _vorp_cache:
+            _vorp_cache.move_to_end(key)
+            return _vorp_cache[key]
+
+    levels = replacement_levels(ros, scoring, fa_pool, team_count, slots)
+    vorp = vorp_rankings(ros, scoring, {**levels, PICK_POSITION: pick_replacement_level(levels, slots)})
+    result = (vorp, levels, ':'.join(['vorp', *map(str, key)]))
+
+    with _vorp_cache_lock:
+        _vorp_cache[key] = result
+        while len(_vorp_cache) > VORP_CACHE_SIZE:
+            _vorp_cache.popitem(last=False)
+    return result
+
+
+#######################
+##### Draft Picks #####
+#######################
+
+# Round words the rankings use for picks, and where in the round Early/Mid/Late sit
+_PICK_ROUNDS = {'1st': 1, '2nd': 2, '3rd': 3, '4th': 4, '5th': 5}
+_PICK_THIRDS = {'early': 1/6, 'mid': 1/2, 'late': 5/6}
+
+
+# Year, round and pick within the round (a 0-1 fraction, None when the name doesn't say)
+# of a rankings pick such as '2025 1.03', '2025 Round 1 Pick 3', '2025 Early 1st' or
+# '2026 2nd'. Returns None for names that aren't picks.
+def parse_pick(name, team_count):
+    name = str(name)
+    year = re.search(r'\b(20\d\d)\b', name)
+    if year is None:
+        return None
+    rest = name[:year.start()] + name[year.end():]
+    exact = re.search(r'\b(\d+)\.(\d{1,2})\b', rest) or re.search(r'round\s*(\d+)\D+?(\d+)', rest, re.I)
+    if exact:
+        return int(year.group(1)), int(exact.group(1)), (int(exact.group(2)) - 1)/max(team_count - 1, 1)
+    third = re.search(r'(early|mid|late)\w*\s+(\d)(?:st|nd|rd|th)', rest, re.I)
+    if third:
+        return int(year.group(1)), int(third.group(2)), _PICK_THIRDS[third.group(1).lower()]
+    rnd = re.search(r'round\s*(\d+)', rest, re.I) or re.search(r'\b(\d)(?:st|nd|rd|th)\b', rest)
+    if rnd:
+        return int(year.group(1)), int(rnd.group(1)), None
+    return None
+
+
+# Value curve for each draft year: overall pick numbers (round by round, 1 to
+# rounds x team_count) and the value at each, from every pick in the rankings. Picks
+# the rankings only give a round for sit at the middle of it.
+def pick_value_curves(pick_values, scoring, team_count):
+    points = collections.defaultdict(lambda: collections.defaultdict(list))
+    for name, value in zip(pick_values['Player Name'], pick_values[scoring].to_numpy(dtype=np.float64)):
+        pick = parse_pick(name, team_count)
+        if pick is None or np.isnan(value):
+            continue
+        year, rnd, within = pick
+        points[year][(rnd - 1)*team_count + 1 + (team_count - 1)*(.5 if within is None else within)].append(value)
+    curves = {}
+    for year, by_pick in points.items():
+        overall = np.array(sorted(by_pick))
+        curves[year] = (overall, np.array([np.mean(by_pick[o]) for o in overall]))
+    return curves
+
+
+# Every team's picks as tradeable assets, keyed by team name, each a frame in the trade
+# calculator's layout. Teams are assumed to own their own picks. The next draft's picks
+# are valued at the slot the standings project (worst team first); later years sit at
+# the middle of each round.
+def team_draft_picks(draft_order, pick_values, scoring, season_year):
+    team_count = len(draft_order)
+    curves = pick_value_curves(pick_values, scoring, team_count)
+    years = sorted(year for year in curves if year > season_year)
+    teams, names, overall, curve_year = [], [], [], []
+    for n, year in enumerate(years):
+        rounds = int(np.ceil(curves[year][0].max()/team_count))
+        for slot, team in enumerate(draft_order, start=1):
+            for rnd in range(1, rounds + 1):
+                teams.append(team)
+                if n == 0:
+                    names.append(f"{year} {rnd}.{slot:02d} ({team})")
+                    overall.append((rnd - 1)*team_count + slot)
+                else:
+                    names.append(f"{year} Round {rnd} ({team})")
+                    overall.append((rnd - 1)*team_count + (team_count + 1)/2)
+                curve_year.append(year)
+
+    overall = np.array(overall, dtype=np.float64)
+    curve_year = np.array(curve_year)
+    value = np.zeros(len(overall))
+    for year in years:
+        in_year = curve_year == year
+        value[in_year] = np.interp(overall[in_year], *curves[year])
+    picks = pd.DataFrame({'Team': teams, 'Pos': PICK_POSITION, 'Player Name': names, scoring: value})
+    return {team: picks.loc[picks['Team'] == team, ['Pos', 'Player Name', scoring]].reset_index(drop=True) for team in draft_order}
+
+
+PICK_CACHE_SIZE = 16
+_pick_cache = collections.OrderedDict()
+_pick_cache_lock = threading.Lock()
+
+
+# team_draft_picks, worked out once per snapshot, rankings and scoring column
+def cached_team_draft_picks(draft_order, pick_values, scoring, season_year, rankings_version, snapshot_version):
+    key = (snapshot_version, rankings_version, scoring)
+    with _pick_cache_lock:
+        if key in _pick_cache:
+            _pick_cache.move_to_end(key)
+            return _pick_cache[key]
+
+    result = team_draft_picks(draft_order, pick_values, scoring, season_year)
+
+    with _pick_cache_lock:
+        _pick_cache[key] = result
+        while len(_pick_cache) > PICK_CACHE_SIZE:
+            _pick_cache.popitem(last=False)
+    return result
+
+
+######################
+##### Age Curves #####
+######################
+
+# Peak age and the yearly rise before it and fall after it, per position. Kickers and
+# defenses (and picks) don't age.
+AGE_CURVES = {"QB": (28, .03, .07), "RB": (25, .06, .18), "WR": (26, .06, .11), "TE": (27, .07, .11)}
+
+# Seasons a long-term value looks ahead, and how much each later season counts
+DYNASTY_SEASONS = int(os.environ.get('DYNASTY_SEASONS', 5))
+SEASON_DISCOUNT = float(os.environ.get('SEASON_DISCOUNT', .85))
+
+# Valuation horizons the dynasty calculator offers, by the seasons each one covers
+HORIZONS = {"Win Now": 1, f"Long Term ({DYNASTY_SEASONS} Seasons)": DYNASTY_SEASONS}
+
+
+# Players x seasons matrix of each player's value in a future season relative to now,
+# from their position's age curve. Missing ages and positions without a curve stay flat.
+def age_curve_matrix(pos, ages, seasons):
+    ages = np.asarray(ages, dtype=np.float64)
+    curves = np.array([AGE_CURVES.get(p, (np.nan, 0, 0)) for p in pos], dtype=np.float64).reshape(-1, 3)
+    peak, rise, fall = curves[:, :1], curves[:, 1:2], curves[:, 2:]
+
+    def level(age):
+        return np.log1p(rise)*np.minimum(age - peak, 0) + np.log1p(-fall)*np.maximum(age - peak, 0)
+
+    future = ages[:, None] + np.arange(seasons)
+    multiplier = np.exp(level(future) - level(ages[:, None]))
+    return np.where(np.isnan(multiplier), 1.0, multiplier)
+
+
+MULTIPLIER_CACHE_SIZE = 8
+_multiplier_cache = collections.OrderedDict()
+_multiplier_cache_lock = threading.Lock()
+
+
+# Each player's discounted multi-season multiplier (a players x seasons matrix, with
+# the discounts folded in and normalised so a flat player keeps their value). Built
+# once per rankings version; every scoring column and horizon reuses it.
+def cached_season_weights(pos, ages, seasons, rankings_version):
+    key = (rankings_version, seasons)
+    with _multiplier_cache_lock:
+        if key in _multiplier_cache:
+            _multiplier_cache.move_to_end(key)
+            return _multiplier_cache[key]
+
+    discounts = SEASON_DISCOUNT**np.arange(seasons)
+    result = age_curve_matrix(pos, ages, seasons)*(discounts/discounts.sum())
+
+    with _multiplier_cache_lock:
+        _multiplier_cache[key] = result
+        while len(_multiplier_cache) > MULTIPLIER_CACHE_SIZE:
+            _multiplier_cache.popitem(last=False)
+    return result
+
+
+# Rankings with the scoring column valued over a horizon of seasons, plus a version
+# string to grade against them with. ages lines up row for row with ros; one season
+# leaves the rankings as they are.
+def horizon_rankings(ros, scoring, ages, seasons, rankings_version):
+    if seasons <= 1 or ages is None:
+        return ros, rankings_version
+    weights = cached_season_weights(ros['Pos'].to_numpy(dtype=object), ages, seasons, rankings_version)
+    valued = ros[["Player Name", "Team", "Pos"]].copy()
+    valued[scoring] = ros[scoring].to_numpy(dtype=np.float64)*weights.sum(axis=1)
+    return valued, f"horizon:{seasons}:{rankings_version}"